@@ -0,0 +1,196 @@
+from src.enums import PieceColor, PieceType
+
+
+# Square index is y * 8 + x, the same (x, y) layout as ChessBoard._board[y][x]
+BOARD_MASK = (1 << 64) - 1
+
+WHITE_INDEX = 0
+BLACK_INDEX = 1
+
+KING_INDEX = PieceType.KING.value - 1
+QUEEN_INDEX = PieceType.QUEEN.value - 1
+ROOK_INDEX = PieceType.ROOK.value - 1
+BISHOP_INDEX = PieceType.BISHOP.value - 1
+KNIGHT_INDEX = PieceType.KNIGHT.value - 1
+PAWN_INDEX = PieceType.PAWN.value - 1
+
+ROOK_DELTAS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+BISHOP_DELTAS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+KING_DELTAS = ROOK_DELTAS + BISHOP_DELTAS
+KNIGHT_DELTAS = [(-1, 2), (1, 2), (2, -1), (2, 1), (-1, -2), (1, -2), (-2, -1), (-2, 1)]
+
+
+def color_index(color: PieceColor) -> int:
+    return WHITE_INDEX if color == PieceColor.WHITE else BLACK_INDEX
+
+
+def piece_index(color: PieceColor, piece_type: PieceType) -> int:
+    """
+    Index of the bitboard for the piece in ChessBoard.pieces (0..11)
+    """
+    return color_index(color) * 6 + piece_type.value - 1
+
+
+def square(x: int, y: int) -> int:
+    return y * 8 + x
+
+
+def square_cord(sq: int) -> tuple[int, int]:
+    return sq & 7, sq >> 3
+
+
+def cord_name(cord: tuple[int, int]) -> str:
+    """
+    Algebraic name of the cell, x = 0 is the h file and y = 0 is the first rank
+    """
+    x, y = cord
+    return f"{'hgfedcba'[x]}{y + 1}"
+
+
+def name_cord(name: str) -> tuple[int, int]:
+    return "hgfedcba".index(name[0]), int(name[1]) - 1
+
+
+def bit(x: int, y: int) -> int:
+    return 1 << (y * 8 + x)
+
+
+def lsb(bb: int) -> int:
+    """
+    Index of the lowest set bit, bb must be non zero
+    """
+    return (bb & -bb).bit_length() - 1
+
+
+def iter_bits(bb: int):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+def popcount(bb: int) -> int:
+    return bin(bb).count("1")
+
+
+def _step_attacks(deltas) -> list[int]:
+    table = []
+    for sq in range(64):
+        x, y = square_cord(sq)
+        attacks = 0
+        for dx, dy in deltas:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < 8 and 0 <= ny < 8:
+                attacks |= bit(nx, ny)
+        table.append(attacks)
+    return table
+
+
+def _ray(sq: int, dx: int, dy: int) -> list[int]:
+    x, y = square_cord(sq)
+    squares = []
+    x, y = x + dx, y + dy
+    while 0 <= x < 8 and 0 <= y < 8:
+        squares.append(square(x, y))
+        x, y = x + dx, y + dy
+    return squares
+
+
+def _ray_table(sq: int, dx: int, dy: int) -> tuple[int, dict[int, int]]:
+    """
+    Attacks along one ray for every occupancy of its relevant squares.
+    The last square of a ray never blocks anything, so it is not relevant.
+    """
+    squares = _ray(sq, dx, dy)
+    relevant = squares[:-1]
+    mask = 0
+    for s in relevant:
+        mask |= 1 << s
+
+    table = {}
+    subset = 0
+    while True:
+        attacks = 0
+        for s in squares:
+            attacks |= 1 << s
+            if subset >> s & 1:
+                break
+        table[subset] = attacks
+
+        subset = (subset - mask) & mask
+        if not subset:
+            break
+    return mask, table
+
+
+def _slider_tables(deltas) -> tuple[list[int], list[dict[int, int]]]:
+    """
+    Occupancy-indexed slider attacks: table[sq][occupied & mask[sq]].
+    Every subset of the relevant squares is combined from the
+    per-ray tables, so the dict lookup plays the role of the magic index.
+    """
+    masks = []
+    tables = []
+    for sq in range(64):
+        rays = [_ray_table(sq, dx, dy) for dx, dy in deltas]
+        mask = 0
+        for ray_mask, _ in rays:
+            mask |= ray_mask
+
+        table = {}
+        subset = 0
+        while True:
+            attacks = 0
+            for ray_mask, ray_table in rays:
+                attacks |= ray_table[subset & ray_mask]
+            table[subset] = attacks
+
+            subset = (subset - mask) & mask
+            if not subset:
+                break
+
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+
+KNIGHT_ATTACKS: list[int] = _step_attacks(KNIGHT_DELTAS)
+KING_ATTACKS: list[int] = _step_attacks(KING_DELTAS)
+
+# PAWN_ATTACKS[color][sq] - squares attacked by a pawn of the color standing on sq
+PAWN_ATTACKS: list[list[int]] = [
+    _step_attacks([(-1, 1), (1, 1)]),
+    _step_attacks([(-1, -1), (1, -1)])
+]
+
+ROOK_MASKS, ROOK_TABLES = _slider_tables(ROOK_DELTAS)
+BISHOP_MASKS, BISHOP_TABLES = _slider_tables(BISHOP_DELTAS)
+
+
+def rook_attacks(sq: int, occupied: int) -> int:
+    return ROOK_TABLES[sq][occupied & ROOK_MASKS[sq]]
+
+
+def bishop_attacks(sq: int, occupied: int) -> int:
+    return BISHOP_TABLES[sq][occupied & BISHOP_MASKS[sq]]
+
+
+def queen_attacks(sq: int, occupied: int) -> int:
+    return ROOK_TABLES[sq][occupied & ROOK_MASKS[sq]] | BISHOP_TABLES[sq][occupied & BISHOP_MASKS[sq]]
+
+
+def _between_table() -> list[list[int]]:
+    """
+    BETWEEN[a][b] - cells strictly between a and b if they share a line, else 0
+    """
+    table = [[0] * 64 for _ in range(64)]
+    for sq in range(64):
+        for dx, dy in KING_DELTAS:
+            between = 0
+            for target in _ray(sq, dx, dy):
+                table[sq][target] = between
+                between |= 1 << target
+    return table
+
+
+BETWEEN: list[list[int]] = _between_table()
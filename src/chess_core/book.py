@@ -0,0 +1,222 @@
+import mmap
+import random
+import struct
+from typing import Iterable, Optional
+
+from src.chess_core.chessboard import ChessBoard, START_FEN
+from src.chess_core.bitboard import QUEEN_INDEX, ROOK_INDEX, BISHOP_INDEX, KNIGHT_INDEX, PAWN_INDEX, iter_bits
+from src.chess_core.move_encoding import FLAG_CASTLE_KINGSIDE, FLAG_CASTLE_QUEENSIDE, TO_SHIFT, PROMOTION_SHIFT
+from src.chess_core.polyglot_keys import POLYGLOT_RANDOM, RANDOM_CASTLE, RANDOM_EN_PASSANT, RANDOM_TURN
+from src.enums import PieceColor
+
+
+# Polyglot entry: key, move, weight, learn; big-endian, sorted by key
+ENTRY = struct.Struct(">QHHI")
+ENTRY_SIZE = ENTRY.size
+KEY = struct.Struct(">Q")
+
+MAX_WEIGHT = 0xFFFF
+
+# Promotion index of move_encoding -> Polyglot promotion
+POLYGLOT_PROMOTIONS = {KNIGHT_INDEX: 1, BISHOP_INDEX: 2, ROOK_INDEX: 3, QUEEN_INDEX: 4}
+
+
+def polyglot_key(chessboard: ChessBoard) -> int:
+    """
+    Polyglot key of the position, the key .bin books are sorted by.
+    The en passant file only counts when a pawn can take en passant.
+    """
+    key = 0
+    for index, bb in enumerate(chessboard.pieces):
+        color, type_index = divmod(index, 6)
+        # Polyglot kinds go pawn .. king with white after black, squares count files from a
+        kind = 2 * (PAWN_INDEX - type_index) + (1 - color)
+        for sq in iter_bits(bb):
+            key ^= POLYGLOT_RANDOM[64 * kind + (sq & ~7) + 7 - (sq & 7)]
+
+    # The castling bits are in the Polyglot order
+    mask = chessboard.castling_rights.mask
+    for right in range(4):
+        if mask >> right & 1:
+            key ^= POLYGLOT_RANDOM[RANDOM_CASTLE + right]
+
+    if chessboard.can_capture_en_passant():
+        key ^= POLYGLOT_RANDOM[RANDOM_EN_PASSANT + 7 - (chessboard.en_passant_square & 7)]
+    if chessboard.side_to_move == PieceColor.WHITE:
+        key ^= POLYGLOT_RANDOM[RANDOM_TURN]
+    return key
+
+
+def polyglot_move(move: int) -> int:
+    """
+    Polyglot move of a packed move: to file, to row, from file, from row, promotion (3 bits each),
+    files count from a. Castling is written as the king taking its own rook.
+    """
+    from_sq = move & 63
+    to_sq = move >> TO_SHIFT & 63
+    if move & FLAG_CASTLE_KINGSIDE:
+        to_sq = to_sq & ~7
+    elif move & FLAG_CASTLE_QUEENSIDE:
+        to_sq = to_sq | 7
+
+    # x = 0 is the h file
+    return (
+        (7 - (to_sq & 7)) | (to_sq >> 3) << 3
+        | (7 - (from_sq & 7)) << 6 | (from_sq >> 3) << 9
+        | POLYGLOT_PROMOTIONS.get(move >> PROMOTION_SHIFT & 7, 0) << 12
+    )
+
+
+class OpeningBook:
+    """
+    Opening book in the Polyglot .bin layout, read through mmap: a lookup is a binary
+    search over the file, nothing is loaded into Python objects.
+
+    The position keys are polyglot_key, so books made by other Polyglot tools can be read
+    and the books of build_book work in them too.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = self._file.seek(0, 2)
+        self.entries = size // ENTRY_SIZE
+        # An empty file can't be mapped
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+
+    def _lower_bound(self, key: int) -> int:
+        data = self._map
+        low, high = 0, self.entries
+        while low < high:
+            middle = (low + high) >> 1
+            if KEY.unpack_from(data, middle * ENTRY_SIZE)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+    def lookup(self, key: int) -> list[tuple[int, int]]:
+        """
+        (polyglot move, weight) of every entry of the key
+        """
+        data = self._map
+        found = []
+        index = self._lower_bound(key)
+        while index < self.entries:
+            entry_key, move, weight, _ = ENTRY.unpack_from(data, index * ENTRY_SIZE)
+            if entry_key != key:
+                break
+            found.append((move, weight))
+            index += 1
+        return found
+
+
+    def moves(self, chessboard: ChessBoard) -> list[tuple[int, int]]:
+        """
+        (packed move, weight) of the book moves that are legal in the position, the heaviest first
+        """
+        entries = self.lookup(polyglot_key(chessboard))
+        if not entries:
+            return []
+
+        legal = {polyglot_move(move): move for move in chessboard.generate_moves()}
+        moves = [(legal[move], weight) for move, weight in entries if move in legal]
+        moves.sort(key=lambda item: item[1], reverse=True)
+        return moves
+
+
+    def choose(self, chessboard: ChessBoard, rng: Optional[random.Random] = None) -> int:
+        """
+        A book move picked at random by weight, 0 if the position is not in the book
+        """
+        moves = [(move, weight) for move, weight in self.moves(chessboard) if weight > 0]
+        if not moves:
+            return 0
+        rng = rng or random
+        return rng.choices([move for move, _ in moves], weights=[weight for _, weight in moves])[0]
+
+
+def write_book(path: str, entries: Iterable[tuple[int, int, int]]):
+    """
+    Writes (key, polyglot move, weight) entries sorted by key
+    """
+    with open(path, "wb") as file:
+        for key, move, weight in sorted(entries):
+            file.write(ENTRY.pack(key, move, min(weight, MAX_WEIGHT), 0))
+
+
+def build_book(pgn_path: str, book_path: str, max_plies: int = 20, min_count: int = 1) -> int:
+    """
+    Book of the first max_plies of every game of a PGN file, a move's weight is how often
+    it was played. Moves played fewer than min_count times are left out.
+    Returns the number of entries.
+    """
+    from src.chess_core.pgn import read_games, parse_san
+
+    counts: dict[tuple[int, int], int] = {}
+    chessboard = ChessBoard()
+    for pgn_game in read_games(pgn_path):
+        chessboard.set_fen(pgn_game.headers.get("FEN", START_FEN))
+        for san in pgn_game.moves[:max_plies]:
+            try:
+                move = parse_san(chessboard, san)
+            except ValueError:
+                break
+            entry = (polyglot_key(chessboard), polyglot_move(move))
+            counts[entry] = counts.get(entry, 0) + 1
+            chessboard.make_move(move)
+
+    entries = [(key, move, count) for (key, move), count in counts.items() if count >= min_count]
+    write_book(book_path, entries)
+    return len(entries)
+
+
+def main():
+    import argparse
+    from src.chess_core.move_encoding import move_name
+
+    parser = argparse.ArgumentParser(description="Build or query an opening book")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build a book from a PGN file")
+    build.add_argument("pgn")
+    build.add_argument("book")
+    build.add_argument("--plies", type=int, default=20)
+    build.add_argument("--min-count", type=int, default=1)
+
+    probe = commands.add_parser("probe", help="print the book moves of a position")
+    probe.add_argument("book")
+    probe.add_argument("--fen", default=START_FEN)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_book(args.pgn, args.book, max_plies=args.plies, min_count=args.min_count)
+        print(f"{count} entries written to {args.book}")
+        return
+
+    chessboard = ChessBoard()
+    chessboard.set_fen(args.fen)
+    with OpeningBook(args.book) as book:
+        print(f"{book.entries} entries")
+        for move, weight in book.moves(chessboard):
+            print(f"{move_name(move)}  {weight}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,141 @@
 from src.chess_core.shapes import King, Figure, Rook, Pawn, Knight, Queen, Bishop
 
-from src.enums import MoveResult, PieceColor
-from src.dataclass import MoveRecord, CastlingRights
-from typing import Optional
-
+from src.enums import MoveResult, PieceColor, GameStatus
+from src.dataclass import MoveRecord, CastlingRights, UndoRecord
+from src.chess_core.bitboard import (
+    color_index, iter_bits, name_cord, cord_name, lsb, square,
+    KING_INDEX, QUEEN_INDEX, ROOK_INDEX, BISHOP_INDEX, KNIGHT_INDEX, PAWN_INDEX,
+    KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS,
+    ROOK_MASKS, ROOK_TABLES, BISHOP_MASKS, BISHOP_TABLES, BETWEEN, BOARD_MASK
+)
+from src.chess_core.evaluation import MIDDLEGAME_SCORES, ENDGAME_SCORES, PHASES, PIECE_VALUES
+from src.chess_core.zobrist import PIECE_KEYS, CASTLING_KEYS, EN_PASSANT_KEYS, SIDE_KEY
+from src.chess_core.move_encoding import (
+    FLAG_CAPTURE, FLAG_EN_PASSANT, FLAG_DOUBLE_PUSH,
+    FLAG_CASTLE_KINGSIDE, FLAG_CASTLE_QUEENSIDE, TO_SHIFT, PROMOTION_SHIFT
+)
+from typing import Callable, Iterator, Optional
+
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+FEN_FIGURES = {"k": King, "q": Queen, "r": Rook, "b": Bishop, "n": Knight, "p": Pawn}
+# FEN letter -> (figure class, color)
+FEN_PIECES = {
+    letter.upper() if color == PieceColor.WHITE else letter: (figure, color)
+    for letter, figure in FEN_FIGURES.items()
+    for color in (PieceColor.WHITE, PieceColor.BLACK)
+}
+FEN_CASTLING = {
+    "K": CastlingRights.WHITE_KING_SIDE,
+    "Q": CastlingRights.WHITE_QUEEN_SIDE,
+    "k": CastlingRights.BLACK_KING_SIDE,
+    "q": CastlingRights.BLACK_QUEEN_SIDE
+}
+# By piece index inside a color
+FEN_LETTERS = "kqrbnp"
+
+# Entries of the per-position game status cache before it is emptied
+STATUS_CACHE_SIZE = 1 << 16
+
+# CASTLING_SQUARE_MASKS[sq] is and-ed into CastlingRights.mask when a move starts or ends on sq:
+# a rook leaving or being captured in its corner, or the king leaving its cell
+CASTLING_SQUARE_MASKS = [15] * 64
+CASTLING_SQUARE_MASKS[0] = 15 & ~CastlingRights.WHITE_KING_SIDE
+CASTLING_SQUARE_MASKS[7] = 15 & ~CastlingRights.WHITE_QUEEN_SIDE
+CASTLING_SQUARE_MASKS[3] = 15 & ~(CastlingRights.WHITE_KING_SIDE | CastlingRights.WHITE_QUEEN_SIDE)
+CASTLING_SQUARE_MASKS[56] = 15 & ~CastlingRights.BLACK_KING_SIDE
+CASTLING_SQUARE_MASKS[63] = 15 & ~CastlingRights.BLACK_QUEEN_SIDE
+CASTLING_SQUARE_MASKS[59] = 15 & ~(CastlingRights.BLACK_KING_SIDE | CastlingRights.BLACK_QUEEN_SIDE)
+
+# Figures created by a packed promotion, keyed by the promotion piece index
+PROMOTION_FIGURES = {QUEEN_INDEX: Queen, ROOK_INDEX: Rook, BISHOP_INDEX: Bishop, KNIGHT_INDEX: Knight}
+PROMOTION_INDEXES = [QUEEN_INDEX, ROOK_INDEX, BISHOP_INDEX, KNIGHT_INDEX]
+
+LAST_RANK = [0xFF << 56, 0xFF]
+START_RANK = [0xFF << 8, 0xFF << 48]
+
+# Squares of the same color as h1 (x + y even)
+DARK_SQUARES = sum(1 << (y * 8 + x) for y in range(8) for x in range(8) if (x + y) % 2 == 0)
+
+# Half moves without a capture or pawn move that make a draw
+FIFTY_MOVES_PLIES = 100
+
+# Piece values of the static exchange evaluation, the king can only be the last capturer
+SEE_VALUES = list(PIECE_VALUES)
+SEE_VALUES[KING_INDEX] = 20_000
+# Least valuable attacker first
+SEE_ORDER = [PAWN_INDEX, KNIGHT_INDEX, BISHOP_INDEX, ROOK_INDEX, QUEEN_INDEX, KING_INDEX]
 
 
 class ChessBoard:
     def __init__(self):
         self.rows = 8
         self.cols = 8
+        self.clear()
+
 
+    def clear(self):
         self.kings: dict[PieceColor, King] = {}
+        # Mailbox view of the position, kept in sync with the bitboards
         self._board = [[0 for _ in range(self.rows)] for _ in range(self.cols)]
 
+        # One bitboard per piece (Figure.piece_index) and per color (Figure.color_index)
+        self.pieces: list[int] = [0] * 12
+        self.occupancy: list[int] = [0, 0]
+        self.occupied: int = 0
+        # Figures of every Figure.piece_index, same layout as pieces
+        self.piece_sets: list[set[Figure]] = [set() for _ in range(12)]
+
         self.castling_rights: CastlingRights = CastlingRights()
-        self.en_passant_target: Optional[tuple[int, int]] = None
+        # Square index of the en passant target or -1, see en_passant_target
+        self.en_passant_square: int = -1
+        self.side_to_move: PieceColor = PieceColor.WHITE
+        # Half moves since the last capture or pawn move, and the number of the current full move
+        self.halfmove_clock: int = 0
+        self.fullmove_number: int = 1
+
+        # Undo records of make_move
+        self._undo_stack: list[UndoRecord] = []
+        # Position key before every move played (apply_move, make_move, make_null_move)
+        self._key_history: list[int] = []
+
+        # Updated incrementally by _put/_remove and apply_move, restored by undo
+        self.zobrist_key: int = CASTLING_KEYS[self.castling_rights.mask]
+
+        # Running material + piece-square sums (white minus black) and game phase,
+        # updated by _put/_remove and read by evaluation.evaluate
+        self.middlegame_score: int = 0
+        self.endgame_score: int = 0
+        self.phase: int = 0
+
+        # (zobrist_key, color) -> result of get_check_state
+        self._check_state_key = None
+        self._check_state = None
+        # (zobrist_key, color index) -> GameStatus, see get_status
+        self._status_cache: dict[tuple[int, int], GameStatus] = {}
 
 
 
+    @property
+    def en_passant_target(self) -> Optional[tuple[int, int]]:
+        sq = self.en_passant_square
+        return (sq & 7, sq >> 3) if sq >= 0 else None
+
+
+    @en_passant_target.setter
+    def en_passant_target(self, cord: Optional[tuple[int, int]]):
+        self.en_passant_square = cord[1] * 8 + cord[0] if cord else -1
+
+
     def get_board(self):
         return self._board
 
 
     def add_figure(self, *, x: int, y: int, figure) -> MoveResult:
-        if not self._board[y][x]: #If cell is empty
+        if self.is_empty(x, y):
 
-            self._board[y][x] = figure
+            self._put(figure, x, y)
 
             if isinstance(figure, King):
                 self.kings[figure.color] = figure
@@ -35,13 +144,134 @@ class ChessBoard:
         return MoveResult.CELL_OCCUPIED
 
 
-    def get_figures(self) -> list[Figure]:
+    def set_fen(self, fen: str):
+        """
+        Replaces the position with the one from the fen string, the move counters
+        may be missing (EPD). Figures are created without textures or renderers.
+        Raises ValueError for a malformed fen, the position is left as it was.
+        """
+        fields = fen.split()
+        if not 1 <= len(fields) <= 6:
+            raise ValueError(f"bad fen '{fen}': expected 1 to 6 fields")
+        placement = fields[0]
+        side = fields[1] if len(fields) > 1 else "w"
+        castling = fields[2] if len(fields) > 2 else "-"
+        en_passant = fields[3] if len(fields) > 3 else "-"
+
         figures = []
-        for y in self._board:
-            for x in y:
-                if not x == 0:
-                    figures.append(x)
-        return figures
+        ranks = placement.split("/")
+        if len(ranks) != 8:
+            raise ValueError(f"bad fen '{fen}': expected 8 ranks, got {len(ranks)}")
+        for y, rank in zip(range(7, -1, -1), ranks):
+            x = 7
+            for char in rank:
+                if char in "12345678":
+                    x -= int(char)
+                elif char in FEN_PIECES:
+                    if x >= 0:
+                        figures.append((*FEN_PIECES[char], x, y))
+                    x -= 1
+                else:
+                    raise ValueError(f"bad fen '{fen}': unknown piece '{char}'")
+            if x != -1:
+                raise ValueError(f"bad fen '{fen}': rank {y + 1} does not have 8 cells")
+
+        for color in (PieceColor.WHITE, PieceColor.BLACK):
+            kings = sum(1 for figure_type, figure_color, _, _ in figures
+                        if figure_type is King and figure_color == color)
+            if kings != 1:
+                raise ValueError(f"bad fen '{fen}': {color.name.lower()} has {kings} kings")
+
+        if side not in ("w", "b"):
+            raise ValueError(f"bad fen '{fen}': side to move must be w or b")
+        if castling != "-" and (
+                any(char not in FEN_CASTLING for char in castling) or len(set(castling)) != len(castling)
+        ):
+            raise ValueError(f"bad fen '{fen}': bad castling rights '{castling}'")
+        # The target is behind a pawn that has just made a double push
+        if en_passant != "-" and (
+                len(en_passant) != 2 or en_passant[0] not in "abcdefgh"
+                or en_passant[1] != ("6" if side == "w" else "3")
+        ):
+            raise ValueError(f"bad fen '{fen}': bad en passant square '{en_passant}'")
+
+        try:
+            halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+            fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise ValueError(f"bad fen '{fen}': move counters must be numbers") from None
+        if halfmove_clock < 0 or fullmove_number < 1:
+            raise ValueError(f"bad fen '{fen}': bad move counters")
+
+        self.clear()
+        put = self._put
+        for figure_type, color, x, y in figures:
+            figure = figure_type(x=x, y=y, color=color)
+            put(figure, x, y)
+            if figure_type is King:
+                self.kings[color] = figure
+
+        # The pieces are already hashed by _put, only the state part changes
+        self.zobrist_key ^= self._state_key()
+
+        mask = 0
+        for char in castling:
+            mask |= FEN_CASTLING.get(char, 0)
+        self.castling_rights.mask = mask
+        self.en_passant_square = -1 if en_passant == "-" else square(*name_cord(en_passant))
+
+        self.side_to_move = PieceColor.WHITE if side == "w" else PieceColor.BLACK
+        self.zobrist_key ^= self._state_key()
+        if self.side_to_move == PieceColor.BLACK:
+            self.zobrist_key ^= SIDE_KEY
+
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_number = fullmove_number
+
+
+    def get_figures(self) -> list[Figure]:
+        board = self._board
+        return [board[sq >> 3][sq & 7] for sq in iter_bits(self.occupied)]
+
+
+    def figure_sets(self, color: PieceColor) -> list[set[Figure]]:
+        """
+        The six sets of figures of one color (king, queen, rook, bishop, knight, pawn),
+        the sets change with the board so don't make moves while iterating them
+        """
+        offset = color_index(color) * 6
+        return self.piece_sets[offset:offset + 6]
+
+
+    def _put(self, figure: Figure, x: int, y: int):
+        sq = y * 8 + x
+        mask = 1 << sq
+        self._board[y][x] = figure
+        self.pieces[figure.piece_index] |= mask
+        self.piece_sets[figure.piece_index].add(figure)
+        self.occupancy[figure.color_index] |= mask
+        self.occupied |= mask
+        index = figure.piece_index
+        self.zobrist_key ^= PIECE_KEYS[index][sq]
+        self.middlegame_score += MIDDLEGAME_SCORES[index][sq]
+        self.endgame_score += ENDGAME_SCORES[index][sq]
+        self.phase += PHASES[index]
+        figure.cord = (x, y)
+
+
+    def _remove(self, figure: Figure, x: int, y: int):
+        sq = y * 8 + x
+        mask = ~(1 << sq)
+        self._board[y][x] = 0
+        self.pieces[figure.piece_index] &= mask
+        self.piece_sets[figure.piece_index].discard(figure)
+        self.occupancy[figure.color_index] &= mask
+        self.occupied &= mask
+        index = figure.piece_index
+        self.zobrist_key ^= PIECE_KEYS[index][sq]
+        self.middlegame_score -= MIDDLEGAME_SCORES[index][sq]
+        self.endgame_score -= ENDGAME_SCORES[index][sq]
+        self.phase -= PHASES[index]
 
 
     def apply_move(self, move: MoveRecord):
@@ -55,18 +285,29 @@ class ChessBoard:
         to_x, to_y = move.to_pos
 
         piece: Figure = move.piece
+        move.prev_zobrist_key = self.zobrist_key
+        move.prev_halfmove_clock = self.halfmove_clock
+        self._key_history.append(self.zobrist_key)
+
+        if move.captured_piece or isinstance(piece, Pawn):
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if piece.color_index == 1:
+            self.fullmove_number += 1
+
+        # Before the pieces move: whether en passant is possible depends on them
+        self.zobrist_key ^= self._state_key()
 
         if move.captured_piece:
             capture_x, capture_y = move.captured_pos
-            self._board[capture_y][capture_x] = 0
+            self._remove(move.captured_piece, capture_x, capture_y)
 
-        self._board[to_y][to_x] = piece
-        self._board[from_y][from_x] = 0
-
-        piece.cord = move.to_pos
+        self._remove(piece, from_x, from_y)
 
         self.change_castling_rights(move) # has bug auto change castling_rights
-
+        self.zobrist_key ^= self._state_key() ^ SIDE_KEY
+        self.side_to_move = self.side_to_move.opposite()
 
 
         if move.rook:
@@ -74,23 +315,18 @@ class ChessBoard:
             rook_from_x, rook_from_y = move.rook_from
             rook_to_x, rook_to_y = move.rook_to
 
-            self._board[rook_from_y][rook_from_x] = 0
-            self._board[rook_to_y][rook_to_x] = rook
-
-            rook.cord = (rook_to_x, rook_to_y)
+            self._remove(rook, rook_from_x, rook_from_y)
+            self._put(rook, rook_to_x, rook_to_y)
 
         last_line = 7 if move.piece.color == PieceColor.WHITE else 0
         if move.promotion_pawn:
+            self._put(move.promotion_pawn, to_x, to_y)
 
-            self._board[to_y][to_x] = move.promotion_pawn
-
-
-        elif isinstance(move.piece, Pawn) and to_y == last_line:
-            self._board[to_y][to_x] = 0
-
-
-
+        # The pawn leaves the board until the promotion figure is selected
+        elif not (isinstance(move.piece, Pawn) and to_y == last_line):
+            self._put(piece, to_x, to_y)
 
+        piece.cord = move.to_pos
 
 
     def undo(self, move: MoveRecord):
@@ -100,69 +336,512 @@ class ChessBoard:
         # simple move +
         # castle +
         # en_passant +
-        # If move is promotion + capture ? To my mind -
+        # promotion + capture +
         from_x, from_y = move.from_pos
         to_x, to_y = move.to_pos
 
         piece: Figure = move.piece
 
-
-        self._board[from_y][from_x] = piece
-
-        if move.captured_piece is None:
-            self._board[to_y][to_x] = 0
-        else:
-            cx, cy = move.captured_pos
-            self._board[cy][cx] = move.captured_piece
+        # The moved piece, the promoted figure or nothing if the pawn waits for promotion
+        target = self._board[to_y][to_x]
+        if target:
+            self._remove(target, to_x, to_y)
 
         if move.rook:
             rook = move.rook
             rook_from_x, rook_from_y = move.rook_from
             rook_to_x, rook_to_y = move.rook_to
 
-            self._board[rook_to_y][rook_to_x] = 0
-            self._board[rook_from_y][rook_from_x] = rook
+            self._remove(rook, rook_to_x, rook_to_y)
+            self._put(rook, rook_from_x, rook_from_y)
 
-            rook.cord = (rook_from_x, rook_from_y)
+        self._put(piece, from_x, from_y)
 
-        piece.cord = move.from_pos
+        if move.captured_piece is not None:
+            cx, cy = move.captured_pos
+            self._put(move.captured_piece, cx, cy)
 
-        self.castling_rights = move.prev_castling_rights
+        self.castling_rights.mask = move.prev_castling_rights
         self.en_passant_target = move.prev_en_passant
+        self.side_to_move = self.side_to_move.opposite()
+        self.zobrist_key = move.prev_zobrist_key
+        self.halfmove_clock = move.prev_halfmove_clock
+        self._key_history.pop()
+        if piece.color_index == 1:
+            self.fullmove_number -= 1
+
+
+    def generate_moves(self, captures_only: bool = False, quiets_only: bool = False) -> list[int]:
+        """
+        All legal moves of the side to move as packed ints (see move_encoding),
+        filtered with the check and pin masks of get_check_state.
+        captures_only keeps captures, en passant and queen promotions (quiescence search),
+        quiets_only keeps the rest.
+        """
+        color = self.side_to_move
+        own = color_index(color)
+        enemy = own ^ 1
+        offset = own * 6
+        pieces = self.pieces
+        occupied = self.occupied
+        friends = self.occupancy[own]
+        enemies = self.occupancy[enemy]
+        if captures_only:
+            not_friends = enemies
+        elif quiets_only:
+            not_friends = ~occupied
+        else:
+            not_friends = ~friends
 
+        checkers, check_mask, pins = self.get_check_state(color)
+        moves = []
+        append = moves.append
 
-    def change_castling_rights(self, record: MoveRecord):
-        piece = record.piece
-        from_x, from_y = record.from_pos
-        to_x, to_y = record.to_pos
-        color = record.piece.color
+        king_sq = lsb(pieces[offset + KING_INDEX])
+        without_king = occupied ^ (1 << king_sq)
+        for to in iter_bits(KING_ATTACKS[king_sq] & not_friends):
+            if not self.is_attacked(to, enemy, without_king):
+                append(king_sq | to << TO_SHIFT | (FLAG_CAPTURE if enemies >> to & 1 else 0))
 
+        if check_mask == 0:
+            return moves
 
-        if isinstance(record.piece, Rook):
+        if not checkers and not captures_only:
+            self._append_castles(moves, own, king_sq)
 
-            if from_x == 0 and self.castling_rights.can_castle_kingside(color):
-                if color == PieceColor.WHITE:
-                    self.castling_rights.white_king_side = False
+        for sq in iter_bits(pieces[offset + KNIGHT_INDEX]):
+            if sq in pins:
+                continue
+            for to in iter_bits(KNIGHT_ATTACKS[sq] & not_friends & check_mask):
+                append(sq | to << TO_SHIFT | (FLAG_CAPTURE if enemies >> to & 1 else 0))
+
+        queens = pieces[offset + QUEEN_INDEX]
+        for sq in iter_bits(pieces[offset + BISHOP_INDEX] | queens):
+            targets = BISHOP_TABLES[sq][occupied & BISHOP_MASKS[sq]] & not_friends & check_mask & pins.get(sq, -1)
+            for to in iter_bits(targets):
+                append(sq | to << TO_SHIFT | (FLAG_CAPTURE if enemies >> to & 1 else 0))
+
+        for sq in iter_bits(pieces[offset + ROOK_INDEX] | queens):
+            targets = ROOK_TABLES[sq][occupied & ROOK_MASKS[sq]] & not_friends & check_mask & pins.get(sq, -1)
+            for to in iter_bits(targets):
+                append(sq | to << TO_SHIFT | (FLAG_CAPTURE if enemies >> to & 1 else 0))
+
+        self._append_pawn_moves(moves, own, occupied, enemies, check_mask, pins, not quiets_only, not captures_only)
+        return moves
+
+
+    def iter_moves(
+            self, hash_move: int = 0, killers=(), quiet_key: Optional[Callable[[int], int]] = None
+    ) -> Iterator[int]:
+        """
+        Legal moves of the side to move in stages: the hash move, captures by MVV-LVA,
+        the killer moves, then the quiet moves (sorted by quiet_key if given).
+        A stage is only generated when the moves before it are used up, so a cutoff
+        on the first moves never pays for the quiet moves.
+        """
+        if hash_move and self.is_legal(hash_move):
+            yield hash_move
+        else:
+            hash_move = 0
+
+        captures = self.generate_moves(captures_only=True)
+        captures.sort(key=self.capture_order, reverse=True)
+        for move in captures:
+            if move != hash_move:
+                yield move
+
+        # A killer is a quiet move of a sibling position, is_legal rejects it if it became a capture
+        played = [hash_move]
+        for killer in killers:
+            if (
+                    killer and killer not in played and not killer & (FLAG_CAPTURE | FLAG_EN_PASSANT)
+                    and not killer >> PROMOTION_SHIFT & 7 and self.is_legal(killer)
+            ):
+                played.append(killer)
+                yield killer
+
+        quiets = self.generate_moves(quiets_only=True)
+        if quiet_key is not None:
+            quiets.sort(key=quiet_key, reverse=True)
+        for move in quiets:
+            if move not in played:
+                yield move
+
+
+    def capture_order(self, move: int) -> int:
+        """
+        MVV-LVA sort key: the most valuable victim first, then the least valuable attacker
+        """
+        board = self._board
+        to_sq = move >> TO_SHIFT & 63
+        from_sq = move & 63
+
+        victim = board[to_sq >> 3][to_sq & 7]
+        if victim:
+            value = PIECE_VALUES[victim.piece_index % 6] * 10
+        elif move & FLAG_EN_PASSANT:
+            value = PIECE_VALUES[PAWN_INDEX] * 10
+        else:
+            value = 0
+
+        promotion = move >> PROMOTION_SHIFT & 7
+        if promotion:
+            value += (PIECE_VALUES[promotion] - PIECE_VALUES[PAWN_INDEX]) * 10
+        return value - PIECE_VALUES[board[from_sq >> 3][from_sq & 7].piece_index % 6] // 10
+
+
+    def is_legal(self, move: int) -> bool:
+        """
+        Whether a packed move, for example from the transposition table or a killer slot,
+        is legal in this position, without generating all moves
+        """
+        from_sq = move & 63
+        to_sq = move >> TO_SHIFT & 63
+        color = self.side_to_move
+        own = color_index(color)
+        piece = self._board[from_sq >> 3][from_sq & 7]
+        if not piece or piece.color_index != own:
+            return False
 
-                if color == PieceColor.BLACK:
-                    self.castling_rights.black_king_side = False
+        checkers, check_mask, pins = self.get_check_state(color)
+        occupied = self.occupied
+        enemies = self.occupancy[own ^ 1]
+        type_index = piece.piece_index % 6
 
-            if from_x == 7 and self.castling_rights.can_castle_queenside(color):
-                if color == PieceColor.WHITE:
-                    self.castling_rights.white_queen_side = False
+        if move & (FLAG_CASTLE_KINGSIDE | FLAG_CASTLE_QUEENSIDE):
+            moves = []
+            if type_index == KING_INDEX and not checkers:
+                self._append_castles(moves, own, from_sq)
+            return move in moves
 
-                if color == PieceColor.BLACK:
-                    self.castling_rights.black_queen_side = False
+        if type_index == PAWN_INDEX:
+            moves = []
+            self._append_pawn_moves(moves, own, occupied, enemies, check_mask, pins)
+            return move in moves
 
+        if move & (FLAG_EN_PASSANT | FLAG_DOUBLE_PUSH) or move >> PROMOTION_SHIFT & 7:
+            return False
+        if self.occupancy[own] >> to_sq & 1:
+            return False
+        if bool(move & FLAG_CAPTURE) != bool(enemies >> to_sq & 1):
+            return False
 
-        if isinstance(piece, King):
-            if color == PieceColor.WHITE:
-                self.castling_rights.white_king_side = False
-                self.castling_rights.white_queen_side = False
+        if type_index == KING_INDEX:
+            return bool(KING_ATTACKS[from_sq] >> to_sq & 1) and not self.is_attacked(
+                to_sq, own ^ 1, occupied ^ (1 << from_sq)
+            )
+
+        if type_index == KNIGHT_INDEX:
+            if from_sq in pins:
+                return False
+            targets = KNIGHT_ATTACKS[from_sq]
+        elif type_index == BISHOP_INDEX:
+            targets = BISHOP_TABLES[from_sq][occupied & BISHOP_MASKS[from_sq]]
+        elif type_index == ROOK_INDEX:
+            targets = ROOK_TABLES[from_sq][occupied & ROOK_MASKS[from_sq]]
+        else:
+            targets = (
+                ROOK_TABLES[from_sq][occupied & ROOK_MASKS[from_sq]]
+                | BISHOP_TABLES[from_sq][occupied & BISHOP_MASKS[from_sq]]
+            )
+        return bool((targets & check_mask & pins.get(from_sq, -1)) >> to_sq & 1)
+
+
+    def _append_castles(self, moves: list[int], own: int, king_sq: int):
+        rights = self.castling_rights.mask >> (own * 2)
+        occupied = self.occupied
+        enemy = own ^ 1
+
+        # Kingside: the king goes from x = 3 to x = 1, cells x = 1, 2 must be empty
+        if rights & 1 and not occupied & (6 << (king_sq - 3)):
+            if not (
+                    self.is_attacked(king_sq, enemy, occupied)
+                    or self.is_attacked(king_sq - 1, enemy, occupied)
+                    or self.is_attacked(king_sq - 2, enemy, occupied)
+            ):
+                moves.append(king_sq | (king_sq - 2) << TO_SHIFT | FLAG_CASTLE_KINGSIDE)
+
+        # Queenside: the king goes from x = 3 to x = 5, cells x = 4, 5, 6 must be empty
+        if rights & 2 and not occupied & (0x70 << (king_sq - 3)):
+            if not (
+                    self.is_attacked(king_sq, enemy, occupied)
+                    or self.is_attacked(king_sq + 1, enemy, occupied)
+                    or self.is_attacked(king_sq + 2, enemy, occupied)
+            ):
+                moves.append(king_sq | (king_sq + 2) << TO_SHIFT | FLAG_CASTLE_QUEENSIDE)
+
+
+    def _append_pawn_moves(self, moves, own, occupied, enemies, check_mask, pins, captures=True, quiets=True):
+        """
+        Captures are captures, en passant and queen promotions, quiets are the other moves
+        """
+        append = moves.append
+        forward = 8 if own == 0 else -8
+        last_rank = LAST_RANK[own]
+        start_rank = START_RANK[own]
+        attacks = PAWN_ATTACKS[own]
+        ep_sq = self.en_passant_square
+
+        for sq in iter_bits(self.pieces[own * 6 + PAWN_INDEX]):
+            allowed = check_mask & pins.get(sq, -1)
+
+            to = sq + forward
+            if not occupied >> to & 1:
+                if allowed >> to & 1:
+                    if last_rank >> to & 1:
+                        for promotion in PROMOTION_INDEXES:
+                            if captures if promotion == QUEEN_INDEX else quiets:
+                                append(sq | to << TO_SHIFT | promotion << PROMOTION_SHIFT)
+                    elif quiets:
+                        append(sq | to << TO_SHIFT)
+
+                double = to + forward
+                if quiets and start_rank >> sq & 1 and not occupied >> double & 1 and allowed >> double & 1:
+                    append(sq | double << TO_SHIFT | FLAG_DOUBLE_PUSH)
+
+            if not captures:
+                continue
+
+            for to in iter_bits(attacks[sq] & enemies & allowed):
+                if last_rank >> to & 1:
+                    for promotion in PROMOTION_INDEXES:
+                        append(sq | to << TO_SHIFT | promotion << PROMOTION_SHIFT | FLAG_CAPTURE)
+                else:
+                    append(sq | to << TO_SHIFT | FLAG_CAPTURE)
+
+            # En passant removes two pieces from one rank, so it is checked on the board
+            if ep_sq >= 0 and attacks[sq] >> ep_sq & 1:
+                move = sq | ep_sq << TO_SHIFT | FLAG_EN_PASSANT
+                self.make_move(move)
+                if not self.is_attacked(lsb(self.pieces[own * 6 + KING_INDEX]), own ^ 1, self.occupied):
+                    append(move)
+                self.unmake_move()
+
+
+    def make_move(self, move: int):
+        """
+        Plays a packed move from generate_moves, take it back with unmake_move
+        """
+        from_sq = move & 63
+        to_sq = move >> TO_SHIFT & 63
+        board = self._board
+        piece = board[from_sq >> 3][from_sq & 7]
+
+        castling_rights = self.castling_rights
+        record = UndoRecord(
+            move, piece, castling_rights.mask, self.en_passant_square, self.zobrist_key, self.halfmove_clock
+        )
+        self._key_history.append(self.zobrist_key)
+        self.zobrist_key ^= self._state_key()
+
+        if move & (FLAG_CAPTURE | FLAG_EN_PASSANT) or piece.piece_index % 6 == PAWN_INDEX:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if piece.color_index == 1:
+            self.fullmove_number += 1
+
+        if move & FLAG_EN_PASSANT:
+            captured_sq = to_sq - 8 if piece.color_index == 0 else to_sq + 8
+            captured = board[captured_sq >> 3][captured_sq & 7]
+            record.captured = captured
+            self._remove(captured, captured_sq & 7, captured_sq >> 3)
+
+        elif move & FLAG_CAPTURE:
+            captured = board[to_sq >> 3][to_sq & 7]
+            record.captured = captured
+            self._remove(captured, to_sq & 7, to_sq >> 3)
+
+        self._remove(piece, from_sq & 7, from_sq >> 3)
+
+        promotion = move >> PROMOTION_SHIFT & 7
+        if promotion:
+            promoted = PROMOTION_FIGURES[promotion](x=to_sq & 7, y=to_sq >> 3, color=piece.color)
+            record.promoted = promoted
+            self._put(promoted, to_sq & 7, to_sq >> 3)
+        else:
+            self._put(piece, to_sq & 7, to_sq >> 3)
+
+        if move & FLAG_CASTLE_KINGSIDE:
+            rook = board[to_sq >> 3][0]
+            self._remove(rook, 0, to_sq >> 3)
+            self._put(rook, 2, to_sq >> 3)
+
+        elif move & FLAG_CASTLE_QUEENSIDE:
+            rook = board[to_sq >> 3][7]
+            self._remove(rook, 7, to_sq >> 3)
+            self._put(rook, 4, to_sq >> 3)
+
+        castling_rights.mask &= CASTLING_SQUARE_MASKS[from_sq] & CASTLING_SQUARE_MASKS[to_sq]
+        self.en_passant_square = (from_sq + to_sq) >> 1 if move & FLAG_DOUBLE_PUSH else -1
+
+        self.zobrist_key ^= self._state_key() ^ SIDE_KEY
+        self.side_to_move = self.side_to_move.opposite()
+        self._undo_stack.append(record)
 
-            elif color == PieceColor.BLACK:
-                self.castling_rights.black_king_side = False
-                self.castling_rights.black_queen_side = False
+
+    def unmake_move(self):
+        record = self._undo_stack.pop()
+        move = record.move
+        from_sq = move & 63
+        to_sq = move >> TO_SHIFT & 63
+        piece = record.piece
+
+        if record.promoted:
+            self._remove(record.promoted, to_sq & 7, to_sq >> 3)
+        else:
+            self._remove(piece, to_sq & 7, to_sq >> 3)
+        self._put(piece, from_sq & 7, from_sq >> 3)
+
+        captured = record.captured
+        if captured:
+            if move & FLAG_EN_PASSANT:
+                captured_sq = to_sq - 8 if piece.color_index == 0 else to_sq + 8
+            else:
+                captured_sq = to_sq
+            self._put(captured, captured_sq & 7, captured_sq >> 3)
+
+        if move & FLAG_CASTLE_KINGSIDE:
+            rook = self._board[to_sq >> 3][2]
+            self._remove(rook, 2, to_sq >> 3)
+            self._put(rook, 0, to_sq >> 3)
+
+        elif move & FLAG_CASTLE_QUEENSIDE:
+            rook = self._board[to_sq >> 3][4]
+            self._remove(rook, 4, to_sq >> 3)
+            self._put(rook, 7, to_sq >> 3)
+
+        self.castling_rights.mask = record.castling
+        self.en_passant_square = record.en_passant
+        self.side_to_move = self.side_to_move.opposite()
+        self.zobrist_key = record.zobrist_key
+        self.halfmove_clock = record.halfmove_clock
+        self._key_history.pop()
+        if piece.color_index == 1:
+            self.fullmove_number -= 1
+
+
+    def make_null_move(self):
+        """
+        Passes the turn (used by null move pruning), take it back with unmake_null_move
+        """
+        self._undo_stack.append(
+            UndoRecord(0, None, self.castling_rights.mask, self.en_passant_square, self.zobrist_key, self.halfmove_clock)
+        )
+        self._key_history.append(self.zobrist_key)
+        self.zobrist_key ^= self._en_passant_key()
+        self.en_passant_square = -1
+        self.zobrist_key ^= SIDE_KEY
+        self.side_to_move = self.side_to_move.opposite()
+
+
+    def unmake_null_move(self):
+        record = self._undo_stack.pop()
+        self.en_passant_square = record.en_passant
+        self.zobrist_key = record.zobrist_key
+        self.side_to_move = self.side_to_move.opposite()
+        self._key_history.pop()
+
+
+    def figure_at(self, sq: int):
+        """
+        Figure on the square index or 0
+        """
+        return self._board[sq >> 3][sq & 7]
+
+
+    def in_check(self) -> bool:
+        """
+        Whether the side to move is in check
+        """
+        own = color_index(self.side_to_move)
+        king_sq = lsb(self.pieces[own * 6 + KING_INDEX])
+        return self.is_attacked(king_sq, own ^ 1, self.occupied)
+
+
+    def get_fen(self) -> str:
+        """
+        FEN of the position, with the move counters
+        """
+        rows = []
+        for y in range(7, -1, -1):
+            row = ""
+            empty = 0
+            for x in range(7, -1, -1):
+                figure = self._board[y][x]
+                if not figure:
+                    empty += 1
+                    continue
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                letter = FEN_LETTERS[figure.piece_index % 6]
+                row += letter.upper() if figure.color_index == 0 else letter
+            if empty:
+                row += str(empty)
+            rows.append(row)
+
+        rights = self.castling_rights
+        castling = (
+            ("K" if rights.white_king_side else "")
+            + ("Q" if rights.white_queen_side else "")
+            + ("k" if rights.black_king_side else "")
+            + ("q" if rights.black_queen_side else "")
+        ) or "-"
+        en_passant = cord_name(self.en_passant_target) if self.en_passant_square >= 0 else "-"
+        side = "w" if self.side_to_move == PieceColor.WHITE else "b"
+        return f"{'/'.join(rows)} {side} {castling} {en_passant} {self.halfmove_clock} {self.fullmove_number}"
+
+
+    def _state_key(self) -> int:
+        """
+        Part of the zobrist key for castling rights and the en passant target
+        """
+        return CASTLING_KEYS[self.castling_rights.mask] ^ self._en_passant_key()
+
+
+    def _en_passant_key(self) -> int:
+        """
+        Key of the en passant file, only if a pawn can take en passant. Otherwise the position
+        after a double push would never match the same position reached by other moves.
+        """
+        if self.can_capture_en_passant():
+            return EN_PASSANT_KEYS[self.en_passant_square & 7]
+        return 0
+
+
+    def can_capture_en_passant(self) -> bool:
+        """
+        A pawn attacks the en passant target, whether the capture is legal is not checked
+        """
+        sq = self.en_passant_square
+        if sq < 0:
+            return False
+        # A target on the third rank is taken by black
+        capturer = 1 if sq >> 3 == 2 else 0
+        return bool(PAWN_ATTACKS[capturer ^ 1][sq] & self.pieces[capturer * 6 + PAWN_INDEX])
+
+
+    def compute_zobrist_key(self) -> int:
+        """
+        Zobrist key computed from scratch, the incremental zobrist_key must be equal to it
+        """
+        key = self._state_key()
+        for index, bb in enumerate(self.pieces):
+            for sq in iter_bits(bb):
+                key ^= PIECE_KEYS[index][sq]
+        if self.side_to_move == PieceColor.BLACK:
+            key ^= SIDE_KEY
+        return key
+
+    def change_castling_rights(self, record: MoveRecord):
+        piece = record.piece
+        from_x, from_y = record.from_pos
+        to_x, to_y = record.to_pos
+
+        self.castling_rights.mask &= (
+            CASTLING_SQUARE_MASKS[from_y * 8 + from_x] & CASTLING_SQUARE_MASKS[to_y * 8 + to_x]
+        )
 
         dif = abs(from_y - to_y)
         if isinstance(piece, Pawn) and dif == 2:
@@ -178,8 +857,7 @@ class ChessBoard:
 
 
     def is_empty(self, x: int, y: int) -> bool:
-        piece = self._board[y][x]
-        return piece == 0
+        return not self.occupied >> (y * 8 + x) & 1
 
 
     def is_inside(self, x: int, y: int) -> bool:
@@ -195,102 +873,343 @@ class ChessBoard:
 
 
     def is_square_attacked(self, x, y, enemy):
-        ray_attack = {
-            (Rook, Queen): [
-                (1, 0), (0, 1), (-1, 0), (0, -1)
-            ],
-            (Bishop, Queen) : [
-                (1, 1), (1, -1), (-1, 1), (-1, -1)
-            ]
-        }
-        single_attack = {
-            King: [(1, 0), (0, 1), (-1, 0), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)],
-
-            Knight: [(-1, 2), (1, 2), (2, -1), (2, 1), (-1, -2), (1, -2), (-2, -1), (-2, 1)]
-        }
-
-        for ex, deltas in ray_attack.items():
-            if self.ray_attack(
-                    x=x,
-                    y=y,
-                    enemy_color=enemy,
-                    expected_types=ex,
-                    deltas=deltas
-            ):
-                return True
-
-        for ex, deltas in single_attack.items():
-            if self.single_attack(
-                    x=x,
-                    y=y,
-                    enemy_color=enemy,
-                    expected_types=ex,
-                    deltas=deltas
-            ):
-                return True
+        return self.is_attacked(y * 8 + x, color_index(enemy), self.occupied)
 
-        direction = -1 if enemy == PieceColor.WHITE else 1
 
-        for dx in (-1, 1):
-            if self.has_piece(x + dx, y - direction, Pawn, enemy):
-                return True
+    def is_attacked(self, sq: int, enemy_index: int, occupied: int) -> bool:
+        """
+        Whether the square is attacked by the color with index enemy_index,
+        with sliders blocked by the given occupancy
+        """
+        offset = enemy_index * 6
+        pieces = self.pieces
 
-        return False
+        if KNIGHT_ATTACKS[sq] & pieces[offset + KNIGHT_INDEX]:
+            return True
 
+        # An enemy pawn stands where a friendly pawn on this square would attack
+        if PAWN_ATTACKS[enemy_index ^ 1][sq] & pieces[offset + PAWN_INDEX]:
+            return True
 
-    def has_piece(self, x: int, y: int, piece_type: type, color: PieceColor) -> bool:
-        if not self.is_inside(x, y): # If x, y not in the board
-            return False
+        if KING_ATTACKS[sq] & pieces[offset + KING_INDEX]:
+            return True
 
-        piece = self._board[y][x]
-        if piece == 0:
-            return False
+        queens = pieces[offset + QUEEN_INDEX]
 
-        return isinstance(piece, piece_type) and piece.color == color
+        rooks = pieces[offset + ROOK_INDEX] | queens
+        if rooks and ROOK_TABLES[sq][occupied & ROOK_MASKS[sq]] & rooks:
+            return True
 
+        bishops = pieces[offset + BISHOP_INDEX] | queens
+        if bishops and BISHOP_TABLES[sq][occupied & BISHOP_MASKS[sq]] & bishops:
+            return True
 
-    def ray_attack(self, enemy_color, expected_types, deltas, x, y):
-        deltas = deltas
+        return False
 
-        for dx, dy in deltas:
-            nx, ny = x + dx, y + dy
-            while True:
 
-                if not self.is_inside(nx, ny):
+    def attackers_to(self, sq: int, occupied: int) -> int:
+        """
+        Bitboard of the pieces of both colors attacking the square,
+        with sliders blocked by the given occupancy
+        """
+        pieces = self.pieces
+        queens = pieces[QUEEN_INDEX] | pieces[6 + QUEEN_INDEX]
+        rooks = pieces[ROOK_INDEX] | pieces[6 + ROOK_INDEX] | queens
+        bishops = pieces[BISHOP_INDEX] | pieces[6 + BISHOP_INDEX] | queens
+
+        return (
+            KNIGHT_ATTACKS[sq] & (pieces[KNIGHT_INDEX] | pieces[6 + KNIGHT_INDEX])
+            | KING_ATTACKS[sq] & (pieces[KING_INDEX] | pieces[6 + KING_INDEX])
+            | PAWN_ATTACKS[1][sq] & pieces[PAWN_INDEX]
+            | PAWN_ATTACKS[0][sq] & pieces[6 + PAWN_INDEX]
+            | ROOK_TABLES[sq][occupied & ROOK_MASKS[sq]] & rooks
+            | BISHOP_TABLES[sq][occupied & BISHOP_MASKS[sq]] & bishops
+        ) & occupied
+
+
+    def see(self, move: int) -> int:
+        """
+        Static exchange evaluation: material won by the side to move (centipawns) when
+        both sides keep capturing on the target square with their least valuable attacker
+        and may stop at any time. Works on bitboards only, the board is not changed.
+        Sliders behind a capturer join the exchange (x-rays), pins are not considered.
+        """
+        from_sq = move & 63
+        to_sq = move >> TO_SHIFT & 63
+        pieces = self.pieces
+        occupancy = self.occupancy
+        board = self._board
+
+        piece = board[from_sq >> 3][from_sq & 7]
+        attacker_value = SEE_VALUES[piece.piece_index % 6]
+        occupied = self.occupied ^ (1 << from_sq)
+
+        if move & FLAG_EN_PASSANT:
+            gain = SEE_VALUES[PAWN_INDEX]
+            occupied ^= 1 << (to_sq - 8 if piece.color_index == 0 else to_sq + 8)
+        else:
+            target = board[to_sq >> 3][to_sq & 7]
+            gain = SEE_VALUES[target.piece_index % 6] if target else 0
+
+        promotion = move >> PROMOTION_SHIFT & 7
+        if promotion:
+            gain += SEE_VALUES[promotion] - SEE_VALUES[PAWN_INDEX]
+            attacker_value = SEE_VALUES[promotion]
+
+        gains = [gain]
+        side = piece.color_index ^ 1
+        while True:
+            attackers = self.attackers_to(to_sq, occupied)
+            side_attackers = attackers & occupancy[side]
+            if not side_attackers:
+                break
+
+            for type_index in SEE_ORDER:
+                candidates = side_attackers & pieces[side * 6 + type_index]
+                if candidates:
                     break
+            # The king can't take a defended piece
+            if type_index == KING_INDEX and attackers & occupancy[side ^ 1]:
+                break
+
+            gains.append(attacker_value - gains[-1])
+            attacker_value = SEE_VALUES[type_index]
+            occupied ^= candidates & -candidates
+            side ^= 1
+
+        for index in range(len(gains) - 1, 0, -1):
+            gains[index - 1] = -max(-gains[index - 1], gains[index])
+        return gains[0]
+
+
+    def get_check_state(self, color: PieceColor) -> tuple[int, int, dict[int, int]]:
+        """
+        Checkers and pins of the king of the color, computed once per position.
+
+        Returns:
+            checkers: bitboard of enemy pieces giving check
+            check_mask: cells a non king move must land on (everything if not in check)
+            pins: cell of a pinned figure -> cells it may move to along the pin
+        """
+        key = (self.zobrist_key, color)
+        if self._check_state_key == key:
+            return self._check_state
+
+        own = color_index(color)
+        enemy_offset = (own ^ 1) * 6
+        pieces = self.pieces
+        king_sq = (pieces[own * 6 + KING_INDEX]).bit_length() - 1
+        occupied = self.occupied
+
+        queens = pieces[enemy_offset + QUEEN_INDEX]
+        rooks = pieces[enemy_offset + ROOK_INDEX] | queens
+        bishops = pieces[enemy_offset + BISHOP_INDEX] | queens
+
+        checkers = (
+            KNIGHT_ATTACKS[king_sq] & pieces[enemy_offset + KNIGHT_INDEX]
+            | PAWN_ATTACKS[own][king_sq] & pieces[enemy_offset + PAWN_INDEX]
+            | ROOK_TABLES[king_sq][occupied & ROOK_MASKS[king_sq]] & rooks
+            | BISHOP_TABLES[king_sq][occupied & BISHOP_MASKS[king_sq]] & bishops
+        )
+
+        if not checkers:
+            check_mask = BOARD_MASK
+        elif checkers & (checkers - 1):
+            # Double check, only the king can move
+            check_mask = 0
+        else:
+            checker_sq = checkers.bit_length() - 1
+            check_mask = checkers | BETWEEN[king_sq][checker_sq]
+
+        # Sliders that see the king through friendly figures only
+        enemies = self.occupancy[own ^ 1]
+        friends = self.occupancy[own]
+        pinners = (
+            ROOK_TABLES[king_sq][enemies & ROOK_MASKS[king_sq]] & rooks
+            | BISHOP_TABLES[king_sq][enemies & BISHOP_MASKS[king_sq]] & bishops
+        )
+        pins = {}
+        for pinner_sq in iter_bits(pinners):
+            between = BETWEEN[king_sq][pinner_sq]
+            blockers = between & friends
+            if blockers and not blockers & (blockers - 1):
+                pins[blockers.bit_length() - 1] = between | 1 << pinner_sq
+
+        self._check_state_key = key
+        self._check_state = (checkers, check_mask, pins)
+        return self._check_state
+
+
+    def has_legal_move(self, color: PieceColor) -> bool:
+        """
+        Whether the color has at least one legal move. Stops at the first one and
+        tries the figures that are cheapest to check first; castling is never needed,
+        a legal castle implies a legal king step.
+        """
+        own = color_index(color)
+        enemy = own ^ 1
+        offset = own * 6
+        pieces = self.pieces
+        occupied = self.occupied
+        not_friends = ~self.occupancy[own] & BOARD_MASK
+        enemies = self.occupancy[enemy]
+
+        checkers, check_mask, pins = self.get_check_state(color)
+
+        if check_mask:
+            for sq in iter_bits(pieces[offset + KNIGHT_INDEX]):
+                if sq not in pins and KNIGHT_ATTACKS[sq] & not_friends & check_mask:
+                    return True
+
+            forward = 8 if own == 0 else -8
+            start_rank = START_RANK[own]
+            attacks = PAWN_ATTACKS[own]
+            for sq in iter_bits(pieces[offset + PAWN_INDEX]):
+                allowed = check_mask & pins.get(sq, -1)
+                if attacks[sq] & enemies & allowed:
+                    return True
+                to = sq + forward
+                if not occupied >> to & 1:
+                    if allowed >> to & 1:
+                        return True
+                    double = to + forward
+                    if start_rank >> sq & 1 and not occupied >> double & 1 and allowed >> double & 1:
+                        return True
 
-                cord: tuple[int, int] = (nx, ny)
-                piece: Figure = self.get_piece(cord=cord)
+        king_sq = lsb(pieces[offset + KING_INDEX])
+        without_king = occupied ^ (1 << king_sq)
+        for to in iter_bits(KING_ATTACKS[king_sq] & not_friends):
+            if not self.is_attacked(to, enemy, without_king):
+                return True
 
+        if not check_mask:
+            return False
 
+        queens = pieces[offset + QUEEN_INDEX]
+        for sq in iter_bits(pieces[offset + BISHOP_INDEX] | queens):
+            if BISHOP_TABLES[sq][occupied & BISHOP_MASKS[sq]] & not_friends & check_mask & pins.get(sq, -1):
+                return True
 
-                if piece:
-                    if piece.color != enemy_color:
-                        break
+        for sq in iter_bits(pieces[offset + ROOK_INDEX] | queens):
+            if ROOK_TABLES[sq][occupied & ROOK_MASKS[sq]] & not_friends & check_mask & pins.get(sq, -1):
+                return True
 
-                    if isinstance(piece, expected_types):
-                        return True
-                    else:
-                        break
+        # En passant belongs to the side to move and is checked on the board
+        ep_sq = self.en_passant_square
+        if ep_sq >= 0 and color == self.side_to_move:
+            for sq in iter_bits(PAWN_ATTACKS[enemy][ep_sq] & pieces[offset + PAWN_INDEX]):
+                self.make_move(sq | ep_sq << TO_SHIFT | FLAG_EN_PASSANT)
+                legal = not self.is_attacked(lsb(pieces[offset + KING_INDEX]), enemy, self.occupied)
+                self.unmake_move()
+                if legal:
+                    return True
 
-                nx, ny = nx + dx, ny + dy
         return False
 
 
-    def single_attack(self, enemy_color, expected_types, deltas, x, y):
-        deltas = deltas
+    def get_status(self, color: PieceColor) -> GameStatus:
+        """
+        CHECKMATE or PAT for the color, then the draws: FIFTY_MOVES, THREEFOLD_REPETITION
+        and INSUFFICIENT_MATERIAL, otherwise IN_PROGRESS.
+        Mate and stalemate are cached by position key, the draws depend on the moves played.
+        """
+        key = (self.zobrist_key, color_index(color))
+        status = self._status_cache.get(key)
+        if status is None:
+            if self.has_legal_move(color):
+                status = GameStatus.IN_PROGRESS
+            elif self.get_check_state(color)[0]:
+                status = GameStatus.CHECKMATE
+            else:
+                status = GameStatus.PAT
+
+            if len(self._status_cache) >= STATUS_CACHE_SIZE:
+                self._status_cache.clear()
+            self._status_cache[key] = status
+
+        if status != GameStatus.IN_PROGRESS:
+            return status
+        if self.halfmove_clock >= FIFTY_MOVES_PLIES:
+            return GameStatus.FIFTY_MOVES
+        if self.repetition_count() >= 2:
+            return GameStatus.THREEFOLD_REPETITION
+        if self.is_insufficient_material():
+            return GameStatus.INSUFFICIENT_MATERIAL
+        return status
+
+
+    def repetition_count(self) -> int:
+        """
+        How many times the position occurred before. Only positions with the same side
+        to move since the last capture or pawn move are compared, by key.
+        """
+        keys = self._key_history
+        key = self.zobrist_key
+        stop = max(len(keys) - self.halfmove_clock, 0)
+        count = 0
+        for index in range(len(keys) - 2, stop - 1, -2):
+            if keys[index] == key:
+                count += 1
+        return count
+
+
+    def repetition_keys(self) -> list[int]:
+        """
+        Keys of the positions since the last capture or pawn move, the ones repetitions are found in
+        """
+        keys = self._key_history
+        return keys[max(len(keys) - self.halfmove_clock, 0):]
+
+
+    def set_repetition_keys(self, keys: list[int]):
+        """
+        Seeds the positions before the current one after set_fen, so a copy of a game
+        (another process) still finds its repetitions
+        """
+        self._key_history = list(keys)
+
+
+    def is_repetition(self) -> bool:
+        """
+        The position occurred before, the search scores it as a draw
+        """
+        keys = self._key_history
+        key = self.zobrist_key
+        stop = max(len(keys) - self.halfmove_clock, 0)
+        for index in range(len(keys) - 2, stop - 1, -2):
+            if keys[index] == key:
+                return True
+        return False
 
-        for dx, dy in deltas:
-            nx, ny = x + dx, y + dy
 
-            if not self.is_inside(nx, ny):
-                continue
-            cord: tuple[int, int] = (nx, ny)
-            piece: Figure = self.get_piece(cord=cord)
-            if piece:
-                return piece.color == enemy_color and isinstance(piece, expected_types)
+    def is_insufficient_material(self) -> bool:
+        """
+        No side can mate: bare kings, a single minor piece, or only bishops on squares of one color
+        """
+        pieces = self.pieces
+        for color_offset in (0, 6):
+            if (
+                    pieces[color_offset + PAWN_INDEX] or pieces[color_offset + ROOK_INDEX]
+                    or pieces[color_offset + QUEEN_INDEX]
+            ):
+                return False
+
+        knights = pieces[KNIGHT_INDEX] | pieces[6 + KNIGHT_INDEX]
+        bishops = pieces[BISHOP_INDEX] | pieces[6 + BISHOP_INDEX]
+        minors = knights | bishops
+        if not minors & (minors - 1):
+            return True
+        if knights:
+            return False
+        return not bishops & DARK_SQUARES or not bishops & ~DARK_SQUARES
 
-        return False
+
+    def has_piece(self, x: int, y: int, piece_type: type, color: PieceColor) -> bool:
+        if not self.is_inside(x, y): # If x, y not in the board
+            return False
+
+        index = color_index(color) * 6 + piece_type.piece_type.value - 1
+        return bool(self.pieces[index] >> (y * 8 + x) & 1)
 
 
     def find_king(self, color: PieceColor) -> tuple[int, int]:
@@ -0,0 +1,82 @@
+from typing import Iterator, Optional, TextIO, Union
+
+from src.chess_core.chessboard import ChessBoard
+
+
+def parse_epd(line: str) -> tuple[str, dict[str, str]]:
+    """
+    Splits an EPD line into a FEN and its operations, for example
+    'bm Nf3; id "test 1";' -> {"bm": "Nf3", "id": "test 1"}.
+    The hmvc / fmvn operations become the move counters of the FEN.
+    """
+    fields = line.split(maxsplit=4)
+    fen = " ".join(fields[:4])
+
+    operations = {}
+    if len(fields) > 4:
+        for operation in _split_operations(fields[4]):
+            opcode, _, operand = operation.partition(" ")
+            operations[opcode] = operand.strip().strip('"')
+
+    if "hmvc" in operations or "fmvn" in operations:
+        fen += f" {operations.get('hmvc', 0)} {operations.get('fmvn', 1)}"
+    return fen, operations
+
+
+def _split_operations(text: str) -> list[str]:
+    """
+    Operations end with ';', a quoted operand may contain ';'
+    """
+    operations = []
+    start = 0
+    quoted = False
+    for index, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif char == ";" and not quoted:
+            operation = text[start:index].strip()
+            if operation:
+                operations.append(operation)
+            start = index + 1
+
+    operation = text[start:].strip()
+    if operation:
+        operations.append(operation)
+    return operations
+
+
+def to_epd(chessboard: ChessBoard, operations: Optional[dict[str, str]] = None) -> str:
+    line = " ".join(chessboard.get_fen().split()[:4])
+    for opcode, operand in (operations or {}).items():
+        if " " in operand:
+            operand = f'"{operand}"'
+        line += f" {opcode} {operand};"
+    return line
+
+
+def read_epd(
+        source: Union[str, TextIO],
+        chessboard: Optional[ChessBoard] = None
+) -> Iterator[tuple[ChessBoard, dict[str, str]]]:
+    """
+    Streams an EPD file (path or open text file) line by line. Every position is
+    set up on the same ChessBoard, so use it before taking the next one.
+    Empty lines, lines starting with '#' and positions set_fen rejects are skipped.
+    """
+    chessboard = chessboard or ChessBoard()
+
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as file:
+            yield from read_epd(file, chessboard)
+        return
+
+    for line in source:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fen, operations = parse_epd(line)
+        try:
+            chessboard.set_fen(fen)
+        except ValueError:
+            continue
+        yield chessboard, operations
@@ -0,0 +1,154 @@
+from src.chess_core.bitboard import color_index
+
+
+# Centipawns by piece index inside a color: king, queen, rook, bishop, knight, pawn
+PIECE_VALUES = [0, 900, 500, 330, 320, 100]
+ENDGAME_VALUES = [0, 920, 520, 330, 300, 120]
+
+# Game phase weight of every piece index inside a color, 24 with all pieces on the board
+PHASE_WEIGHTS = [0, 4, 2, 1, 1, 0]
+TOTAL_PHASE = 24
+
+# Piece-square tables from white's side, as a diagram: rank 8 first, files a..h
+_PAWN = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0
+]
+
+_PAWN_ENDGAME = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+     80,  80,  80,  80,  80,  80,  80,  80,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     30,  30,  30,  30,  30,  30,  30,  30,
+     15,  15,  15,  15,  15,  15,  15,  15,
+      5,   5,   5,   5,   5,   5,   5,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+      0,   0,   0,   0,   0,   0,   0,   0
+]
+
+_KNIGHT = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50
+]
+
+_BISHOP = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20
+]
+
+_ROOK = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0
+]
+
+_QUEEN = [
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20
+]
+
+_KING = [
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20
+]
+
+_KING_ENDGAME = [
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10,   0,   0, -10, -20, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -30,   0,   0,   0,   0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50
+]
+
+# By piece index inside a color: king, queen, rook, bishop, knight, pawn
+_MIDDLEGAME_TABLES = [_KING, _QUEEN, _ROOK, _BISHOP, _KNIGHT, _PAWN]
+_ENDGAME_TABLES = [_KING_ENDGAME, _QUEEN, _ROOK, _BISHOP, _KNIGHT, _PAWN_ENDGAME]
+
+
+def _build(tables: list[list[int]], values: list[int]) -> list[list[int]]:
+    """
+    Material plus position for every Figure.piece_index and square index (y * 8 + x),
+    black entries are negative so the running sums are white minus black
+    """
+    result = []
+    for color in range(2):
+        for index, table in enumerate(tables):
+            row = []
+            for sq in range(64):
+                x, y = sq & 7, sq >> 3
+                # x = 0 is the h file, y = 0 is the first rank
+                if color == 0:
+                    value = table[(7 - y) * 8 + 7 - x]
+                else:
+                    value = -table[y * 8 + 7 - x]
+                row.append(value + values[index] if color == 0 else value - values[index])
+            result.append(row)
+    return result
+
+
+MIDDLEGAME_SCORES: list[list[int]] = _build(_MIDDLEGAME_TABLES, PIECE_VALUES)
+ENDGAME_SCORES: list[list[int]] = _build(_ENDGAME_TABLES, ENDGAME_VALUES)
+PHASES: list[int] = PHASE_WEIGHTS * 2
+
+
+def evaluate(chessboard) -> int:
+    """
+    Tapered material and piece-square score in centipawns from the point of view
+    of the side to move. The sums are kept up to date by ChessBoard._put/_remove,
+    so this is O(1).
+    """
+    phase = min(chessboard.phase, TOTAL_PHASE)
+    score = (chessboard.middlegame_score * phase + chessboard.endgame_score * (TOTAL_PHASE - phase)) // TOTAL_PHASE
+    return score if color_index(chessboard.side_to_move) == 0 else -score
+
+
+def compute_scores(chessboard) -> tuple[int, int, int]:
+    """
+    Middlegame, endgame and phase sums computed from scratch, the incremental ones must match
+    """
+    middlegame = endgame = phase = 0
+    for index, figures in enumerate(chessboard.piece_sets):
+        for figure in figures:
+            x, y = figure.cord
+            middlegame += MIDDLEGAME_SCORES[index][y * 8 + x]
+            endgame += ENDGAME_SCORES[index][y * 8 + x]
+            phase += PHASES[index]
+    return middlegame, endgame, phase
@@ -1,12 +1,20 @@
-from copy import deepcopy
 from typing import Optional
-from src.chess_core.chessboard import ChessBoard
+from src.chess_core.chessboard import ChessBoard, PROMOTION_FIGURES
+from src.chess_core.book import OpeningBook
+from src.chess_core.bitboard import square_cord
+from src.chess_core.move_encoding import (
+    move_from, move_to, move_promotion,
+    FLAG_CAPTURE, FLAG_EN_PASSANT, FLAG_CASTLE_KINGSIDE, FLAG_CASTLE_QUEENSIDE
+)
 from src.enums import MoveResult, PieceColor, MoveSpecial, GameStatus, ClickResult, Errors
 
-from src.dataclass import Move, MoveRecord, CastlingRights, History
+from src.dataclass import Move, MoveRecord, History
 from src.chess_core.shapes import Figure, King, Queen, Bishop, Knight, Rook, Pawn
 
 
+# Positions kept in the legal move cache before it is emptied
+LEGAL_MOVE_CACHE_SIZE = 1024
+
 
 class Game:
     def __init__(self):
@@ -28,8 +36,20 @@ class Game:
         self.history: History = History()
 
         self.promotion_figure = None
+        # Set when anything shown on the screen changes, cleared by the UI after drawing
+        self.dirty = True
+
+        # Legal moves of one color in the current position:
+        # from cell -> moves and (from cell, to cell) -> move
+        self.moves_by_from: dict[tuple[int, int], list[Move]] = {}
+        self.moves_by_path: dict[tuple[tuple[int, int], tuple[int, int]], Move] = {}
+        self._legal_moves_key = None
+        # (zobrist_key, color) -> (from cell, to cell, special) of the legal moves, reused when a position
+        # comes back. Only cells are kept: the same key can come back with other Figure objects on them.
+        self._legal_move_cache: dict[tuple[int, PieceColor], list[tuple]] = {}
 
-        print(self.chessboard.castling_rights)
+        # Consulted by book_moves / book_move, see open_book
+        self.book: Optional[OpeningBook] = None
 
 
 
@@ -38,7 +58,7 @@ class Game:
 
 
 
-    def update(self, x:int=0, y:int=0, command = 0):
+    def update(self, x:int=0, y:int=0, command: Optional[str] = None):
 
         if self.promotion:
 
@@ -52,27 +72,26 @@ class Game:
             if prom_rec:
                 self.chessboard.undo(rec)
                 self.chessboard.apply_move(prom_rec)
+                self.history.push(prom_rec)
                 self.after_move()
 
                 return GameStatus.IN_PROGRESS
 
-        text = input("x, y: ")
-
-
-        if text.lower() == "stop":
-            return GameStatus.EXIT
-
-        str_x, str_y = text.split(" ")
-
         try:
-            int_x, int_y = int(str_x), int(str_y)
+            # A console line "x y" selects a cell like a click does
+            if command is not None:
+                if command.lower() == "stop":
+                    return GameStatus.EXIT
 
-            status = self.selected_cell(board_x=int_x, board_y=int_y)
+                str_x, str_y = command.split(" ")
+                x, y = int(str_x), int(str_y)
+
+            status = self.selected_cell(board_x=x, board_y=y)
 
             match status["num_of_select"]:
                 case 0:
                     first_s_d = status["first_select_data"]
-                    print(f"{first_s_d["selected_piece"]},\n {first_s_d["status"]},\n moves: {first_s_d["moves"]}")
+                    print(f"{first_s_d['selected_piece']},\n {first_s_d['status']},\n moves: {first_s_d['moves']}")
 
                 case 1:
                     print(status["second_select_data"])
@@ -92,7 +111,11 @@ class Game:
 
 
 
-    def create_figures(self, texture_manager):
+    def create_figures(self, texture_manager=None):
+        """
+        Places the start position. Without a texture manager the figures
+        get their textures when the UI first draws them.
+        """
         logs = ""
         configs = {
             "black": {
@@ -128,9 +151,39 @@ class Game:
 
 
     def after_move(self):
-        self.has_move = self.has_move.opposite()
+        self.has_move = self.chessboard.side_to_move
+        self.dirty = True
 
         self.game_status = self.this_end(self.has_move)
+        self.update_legal_moves(self.has_move)
+
+
+    def update_legal_moves(self, color: PieceColor):
+        """
+        Fills moves_by_from and moves_by_path for the color, once per position
+        """
+        key = (self.chessboard.zobrist_key, color)
+        if key == self._legal_moves_key:
+            return
+
+        paths = self._legal_move_cache.get(key)
+        if paths is None:
+            paths = [(move.from_pos, move.to_pos, move.special) for move in self.get_legal_moves(color)]
+            if len(self._legal_move_cache) >= LEGAL_MOVE_CACHE_SIZE:
+                self._legal_move_cache.clear()
+            self._legal_move_cache[key] = paths
+
+        board = self.chessboard.get_board()
+        by_from = {}
+        by_path = {}
+        for from_pos, to_pos, special in paths:
+            from_x, from_y = from_pos
+            move = Move(piece=board[from_y][from_x], from_pos=from_pos, to_pos=to_pos, special=special)
+            by_from.setdefault(from_pos, []).append(move)
+            by_path[(from_pos, to_pos)] = move
+
+        self.moves_by_from, self.moves_by_path = by_from, by_path
+        self._legal_moves_key = key
 
 
     def selected_cell(self, board_x, board_y):
@@ -143,6 +196,8 @@ class Game:
 
         result = self.analyze_select(pos=(board_x, board_y))
         piece = self.chessboard.get_piece(cord=(board_x, board_y))
+        if result != ClickResult.NOTHING:
+            self.dirty = True
 
         match result:
             case ClickResult.SELECT:
@@ -195,27 +250,18 @@ class Game:
         }
 
 
-        moves = piece.get_moves(chessboard=self.chessboard)
-        data = self.filter_moves(moves=moves)
-
-        if data["moves_and_statuses"]: # If figure have at least one move
-            right_moves = data["right_moves"]
-
-            for val in data["moves_and_statuses"]:
-                if val != MoveResult.CHECK:
-                    break
-            else:
-                returned_data["status"] = MoveResult.CHECK
-                return returned_data
-
-
-            for move in right_moves:
-                self.avl_moves.append(move.to_pos)
+        self.update_legal_moves(piece.color)
+        right_moves = self.moves_by_from.get(piece.cord, [])
 
+        if right_moves:
+            self.avl_moves = [move.to_pos for move in right_moves]
             self.available_moves = right_moves
-
             returned_data["moves"] = right_moves
+            return returned_data
 
+        # The figure has moves, but every one of them leaves the king in check
+        if piece.get_moves(chessboard=self.chessboard):
+            returned_data["status"] = MoveResult.CHECK
             return returned_data
 
         returned_data["status"] = MoveResult.INVALID_MOVE
@@ -230,9 +276,13 @@ class Game:
 
         if move:
             to_x, to_y = record.to_pos
-            if isinstance(record.piece, Pawn) and to_y == last_line:
+            promotes = isinstance(record.piece, Pawn) and to_y == last_line
+            if promotes:
                 self.promotion = True
             self.make_move(record)
+            # A promotion ends in update, once the figure is chosen
+            if not promotes:
+                self.after_move()
 
             return MoveResult.OK
 
@@ -240,6 +290,7 @@ class Game:
 
 
     def clear_available_moves(self):
+        self.dirty = True
         self.available_moves = []
         self.avl_moves = []
 
@@ -251,69 +302,87 @@ class Game:
 
         self.history.push(record)
         self.available_moves.clear()
+        self.dirty = True
 
 
-    def this_end(self, color) -> GameStatus:
-        board = self.chessboard.get_board()
-        king_pos = self.chessboard.find_king(color=color)
-        kx, ky = king_pos
-        king: Figure = board[ky][kx]
-        king_moves = king.get_moves(chessboard=self.chessboard)
-        right_moves = self.filter_moves(king_moves)["right_moves"]
+    def open_book(self, path: str):
+        if self.book is not None:
+            self.book.close()
+        self.book = OpeningBook(path)
 
-        status = GameStatus.IN_PROGRESS
 
-        # If king don't have moves
-        if not right_moves:
-            figures = self.chessboard.get_figures()
+    def book_moves(self) -> list[tuple[Move, int]]:
+        """
+        Book moves of the current position with their weights, the heaviest first
+        """
+        if self.book is None:
+            return []
+        return [(unpack_move(self.chessboard, move), weight) for move, weight in self.book.moves(self.chessboard)]
 
-            for fig in figures:
-                if fig.color == color:
-                    moves = fig.get_moves(chessboard=self.chessboard)
-                    right_moves = self.filter_moves(moves)["right_moves"]
 
+    def book_move(self) -> int:
+        """
+        Packed book move picked at random by weight, 0 if the position is not in the book
+        """
+        if self.book is None:
+            return 0
+        return self.book.choose(self.chessboard)
+
+
+    def make_packed_move(self, move: int):
+        """
+        Plays a packed move (see move_encoding), for example the best move of the engine
+        """
+        self.make_move(self.packed_move_record(move))
+        self.after_move()
+        self.first_select = False
 
-                    # If any figure can move
-                    if right_moves:
-                        break
-            # If all figures cannot make move
-            else:
-                king_is_check = self.chessboard.king_is_check(color=color)
-                # Checkmate
-                if king_is_check:
-                    status = GameStatus.CHECKMATE
-                else:
-                    status = GameStatus.PAT
-        return status
+
+    def packed_move_record(self, move: int) -> MoveRecord:
+        """
+        MoveRecord for ChessBoard.apply_move from a packed move of generate_moves
+        """
+        record = self.move_to_move_record(move=unpack_move(self.chessboard, move))
+        promotion = move_promotion(move)
+        if promotion:
+            record = make_promotion(fig=PROMOTION_FIGURES[promotion], record=record)
+        return record
+
+
+    def this_end(self, color) -> GameStatus:
+        return self.chessboard.get_status(color)
 
 
     def find_move_to(self, to_x, to_y) -> Optional[Move]:
-        for move in self.available_moves:
-            if move.to_pos == (to_x, to_y):
-                return move
-        return None
+        self.update_legal_moves(self.selected_piece.color)
+        return self.moves_by_path.get((self.selected_piece.cord, (to_x, to_y)))
 
 
-    def filter_moves(self, moves: list) -> dict:
-        dic: dict = {
-            "right_moves": [],
-            "moves_and_statuses": {}
-        }
+    def filter_move(self, move):
+        if isinstance(move.piece, King) or move.special == MoveSpecial.EN_PASSANT:
+            return self._filter_move_by_make(move)
 
-        if moves:
-            for move in moves:
-                status = self.filter_move(move)
+        checkers, check_mask, pins = self.chessboard.get_check_state(move.piece.color)
 
-                dic["moves_and_statuses"][move] = status
-                if status == MoveResult.OK:
-                    dic["right_moves"].append(move)
+        from_x, from_y = move.from_pos
+        to_x, to_y = move.to_pos
+        target = 1 << (to_y * 8 + to_x)
 
+        # Must capture or block a single checker and stay on the pin line
+        if not target & check_mask:
+            return MoveResult.CHECK
 
-            return dic
-        return dic
+        pin = pins.get(from_y * 8 + from_x)
+        if pin is not None and not target & pin:
+            return MoveResult.CHECK
+
+        return MoveResult.OK
 
 
-    def filter_move(self, move):
+    def _filter_move_by_make(self, move):
+        """
+        King moves and en passant (which can uncover a check along the rank) are checked on the board
+        """
         mr = self.move_to_move_record(move=move)
         self.chessboard.apply_move(mr)
         king_is_check: bool = self.chessboard.king_is_check(move.piece.color)
@@ -330,11 +399,21 @@ class Game:
         return MoveResult.OK
 
 
+    def get_legal_moves(self, color: PieceColor) -> list[Move]:
+        chessboard = self.chessboard
+        # Filtering makes moves on the board, so the figure sets are read first
+        moves = []
+        for figures in chessboard.figure_sets(color):
+            for fig in figures:
+                moves.extend(fig.get_moves(chessboard=chessboard))
+        return [move for move in moves if self.filter_move(move) == MoveResult.OK]
+
+
     def can_king_castle(self, *, move_record: MoveRecord):
         from_x, _ = move_record.from_pos
         to_x, _ = move_record.to_pos
         y = _
-        direction = move_record.piece.direction
+        direction = 1 if to_x > from_x else -1
         for x in range(from_x, to_x + direction, direction):
             if self.chessboard.is_square_attacked(
                         x=x,
@@ -354,7 +433,7 @@ class Game:
         rook_from: Optional[tuple[int, int]] = None
         rook_to: Optional[tuple[int, int]] = None
 
-        prev_castling_rights: CastlingRights = deepcopy(self.chessboard.castling_rights)
+        prev_castling_rights: int = self.chessboard.castling_rights.mask
         prev_en_passant: Optional[tuple[int, int]] = self.chessboard.en_passant_target
 
         board = self.chessboard.get_board()
@@ -431,6 +510,34 @@ class Game:
 
 
 
+def is_promotion(move: Move) -> bool:
+    last_line = 7 if move.piece.color == PieceColor.WHITE else 0
+    return isinstance(move.piece, Pawn) and move.to_pos[1] == last_line
+
+
+def unpack_move(chessboard: ChessBoard, move: int) -> Move:
+    """
+    Move of the figure on the from cell for a packed move (see move_encoding)
+    """
+    from_pos = square_cord(move_from(move))
+    if move & FLAG_CASTLE_KINGSIDE:
+        special = MoveSpecial.CASTLE_KINGSIDE
+    elif move & FLAG_CASTLE_QUEENSIDE:
+        special = MoveSpecial.CASTLE_QUEENSIDE
+    elif move & FLAG_EN_PASSANT:
+        special = MoveSpecial.EN_PASSANT
+    elif move & FLAG_CAPTURE:
+        special = MoveSpecial.CAPTURE
+    else:
+        special = None
+    return Move(
+        piece=chessboard.get_piece(cord=from_pos),
+        from_pos=from_pos,
+        to_pos=square_cord(move_to(move)),
+        special=special
+    )
+
+
 def make_promotion(fig: Figure, record):
     x, y = record.to_pos
     figure = fig(x=x, y=y, color=record.piece.color)
@@ -451,48 +558,50 @@ def get_figures_of_config(*, config) -> list[Figure]:
 
 
 def get_figures_info(*, color, fig_y, pawn_y, texture_manager):
+    get_texture = texture_manager.get_region if texture_manager else lambda name: 0
+
     return {
         "king": {
             "type": King,
             "count": 1,
             "cords": [(3, fig_y)],
             "color": color,
-            "texture": texture_manager.get_texture(f"{color}_king")
+            "texture": get_texture(f"{color}_king")
         },
         "queen": {
             "type": Queen,
             "count": 1,
             "cords": [(4, fig_y)],
             "color": color,
-            "texture": texture_manager.get_texture(f"{color}_queen")
+            "texture": get_texture(f"{color}_queen")
         },
         "bishops": {
             "type": Bishop,
             "count": 2,
             "cords": [(5, fig_y), (2, fig_y)],
             "color": color,
-            "texture": texture_manager.get_texture(f"{color}_bishop")
+            "texture": get_texture(f"{color}_bishop")
         },
         "knights": {
             "type": Knight,
             "count": 2,
             "cords": [(6, fig_y), (1, fig_y)],
             "color": color,
-            "texture": texture_manager.get_texture(f"{color}_knight")
+            "texture": get_texture(f"{color}_knight")
         },
         "rooks": {
             "type": Rook,
             "count": 2,
             "cords": [(7, fig_y), (0, fig_y)],
             "color": color,
-            "texture": texture_manager.get_texture(f"{color}_rook")
+            "texture": get_texture(f"{color}_rook")
         },
         "pawns": {
             "type": Pawn,
             "count": 8,
             "cords": [(x, pawn_y) for x in range(8)],
             "color": color,
-            "texture": texture_manager.get_texture(f"{color}_pawn")
+            "texture": get_texture(f"{color}_pawn")
         }
     }
 
@@ -0,0 +1,47 @@
+from src.chess_core.bitboard import cord_name, square_cord
+
+
+# Packed move layout (one int):
+#   bits 0-5    from square (y * 8 + x)
+#   bits 6-11   to square
+#   bits 12-14  promotion piece index inside a color (QUEEN_INDEX .. KNIGHT_INDEX), 0 = none
+#   bits 15-19  flags
+TO_SHIFT = 6
+PROMOTION_SHIFT = 12
+
+FLAG_CAPTURE = 1 << 15
+FLAG_EN_PASSANT = 1 << 16
+FLAG_DOUBLE_PUSH = 1 << 17
+FLAG_CASTLE_KINGSIDE = 1 << 18
+FLAG_CASTLE_QUEENSIDE = 1 << 19
+
+FLAG_CASTLE = FLAG_CASTLE_KINGSIDE | FLAG_CASTLE_QUEENSIDE
+
+PROMOTION_LETTERS = {1: "q", 2: "r", 3: "b", 4: "n"}
+
+
+def encode_move(from_sq: int, to_sq: int, flags: int = 0, promotion: int = 0) -> int:
+    return from_sq | to_sq << TO_SHIFT | promotion << PROMOTION_SHIFT | flags
+
+
+def move_from(move: int) -> int:
+    return move & 63
+
+
+def move_to(move: int) -> int:
+    return move >> TO_SHIFT & 63
+
+
+def move_promotion(move: int) -> int:
+    return move >> PROMOTION_SHIFT & 7
+
+
+def move_name(move: int) -> str:
+    """
+    Long algebraic notation, for example e2e4 or a7a8q
+    """
+    name = cord_name(square_cord(move & 63)) + cord_name(square_cord(move >> TO_SHIFT & 63))
+    promotion = move >> PROMOTION_SHIFT & 7
+    if promotion:
+        name += PROMOTION_LETTERS[promotion]
+    return name
@@ -0,0 +1,199 @@
+import argparse
+import time
+
+from src.chess_core.game import Game, is_promotion, make_promotion
+from src.chess_core.chessboard import ChessBoard, START_FEN
+from src.chess_core.move_encoding import move_name
+from src.chess_core.shapes import Queen, Rook, Bishop, Knight
+from src.chess_core.bitboard import cord_name
+
+
+# Promotion figures and their letter in long algebraic notation
+PROMOTION_FIGURES = {Queen: "q", Rook: "r", Bishop: "b", Knight: "n"}
+
+# Standard perft positions with known node counts for depth 1, 2, 3, ...
+POSITIONS = [
+    {
+        "name": "start",
+        "fen": START_FEN,
+        "nodes": [20, 400, 8902, 197281, 4865609]
+    },
+    {
+        "name": "kiwipete",
+        "fen": "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "nodes": [48, 2039, 97862, 4085603]
+    },
+    {
+        "name": "endgame",
+        "fen": "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "nodes": [14, 191, 2812, 43238, 674624]
+    },
+    {
+        "name": "promotions",
+        "fen": "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        "nodes": [6, 264, 9467, 422333]
+    },
+    {
+        "name": "talkchess",
+        "fen": "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        "nodes": [44, 1486, 62379, 2103487]
+    },
+    {
+        "name": "middlegame",
+        "fen": "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        "nodes": [46, 2079, 89890, 3894594]
+    }
+]
+
+
+def create_game(fen: str) -> Game:
+    game = Game()
+    game.chessboard.set_fen(fen)
+    game.has_move = game.chessboard.side_to_move
+    return game
+
+
+def legal_records(game: Game):
+    """
+    Yields a move record for every legal move of the side to move,
+    a promotion gives one record per promotion figure
+    """
+    for move in game.get_legal_moves(game.chessboard.side_to_move):
+        if is_promotion(move):
+            for promotion_figure in PROMOTION_FIGURES:
+                record = game.move_to_move_record(move=move)
+                yield move, make_promotion(fig=promotion_figure, record=record)
+        else:
+            yield move, game.move_to_move_record(move=move)
+
+
+def perft(game: Game, depth: int) -> int:
+    if depth == 0:
+        return 1
+
+    chessboard = game.chessboard
+    nodes = 0
+    for _, record in legal_records(game):
+        if depth == 1:
+            nodes += 1
+            continue
+
+        chessboard.apply_move(record)
+        nodes += perft(game, depth - 1)
+        chessboard.undo(record)
+    return nodes
+
+
+def perft_packed(chessboard: ChessBoard, depth: int) -> int:
+    """
+    Perft over ChessBoard.generate_moves/make_move/unmake_move with packed int moves
+    """
+    moves = chessboard.generate_moves()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+
+    nodes = 0
+    make_move = chessboard.make_move
+    unmake_move = chessboard.unmake_move
+    for move in moves:
+        make_move(move)
+        nodes += perft_packed(chessboard, depth - 1)
+        unmake_move()
+    return nodes
+
+
+def divide_packed(chessboard: ChessBoard, depth: int) -> dict[str, int]:
+    result = {}
+    for move in chessboard.generate_moves():
+        chessboard.make_move(move)
+        result[move_name(move)] = perft_packed(chessboard, depth - 1)
+        chessboard.unmake_move()
+    return result
+
+
+def divide(game: Game, depth: int) -> dict[str, int]:
+    """
+    Node count below every root move, keyed by the move in long algebraic notation
+    """
+    chessboard = game.chessboard
+    result = {}
+    for move, record in legal_records(game):
+        name = cord_name(move.from_pos) + cord_name(move.to_pos)
+        if record.promotion_pawn:
+            name += PROMOTION_FIGURES[type(record.promotion_pawn)]
+
+        chessboard.apply_move(record)
+        result[name] = perft(game, depth - 1)
+        chessboard.undo(record)
+    return result
+
+
+def run_suite(depth: int, names: list[str] = None, packed: bool = False) -> bool:
+    """
+    Runs perft for the standard positions and prints nodes, time and nodes/sec.
+    Returns False if any node count differs from the known one.
+    packed=True measures the packed move path instead of Move/MoveRecord.
+    """
+    all_ok = True
+    total_nodes = 0
+    total_time = 0.0
+
+    for position in POSITIONS:
+        if names and position["name"] not in names:
+            continue
+
+        known = position["nodes"]
+        position_depth = min(depth, len(known))
+        game = create_game(position["fen"])
+
+        start = time.perf_counter()
+        if packed:
+            nodes = perft_packed(game.chessboard, position_depth)
+        else:
+            nodes = perft(game, position_depth)
+        elapsed = time.perf_counter() - start
+
+        ok = nodes == known[position_depth - 1]
+        all_ok = all_ok and ok
+        total_nodes += nodes
+        total_time += elapsed
+
+        print(
+            f"{position['name']:<12} depth {position_depth}  nodes {nodes:>10}  "
+            f"{'ok' if ok else 'FAIL expected ' + str(known[position_depth - 1])}  "
+            f"{elapsed:8.2f}s  {nodes / max(elapsed, 1e-9):>10.0f} nps"
+        )
+
+    print(f"{'total':<12}          nodes {total_nodes:>10}  {total_time:12.2f}s  {total_nodes / max(total_time, 1e-9):>10.0f} nps")
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft move generation benchmark")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--position", action="append", help="name of a suite position, can be repeated")
+    parser.add_argument("--fen", help="run divide for this position instead of the suite")
+    parser.add_argument("--packed", action="store_true", help="use packed int moves and make_move/unmake_move")
+    args = parser.parse_args()
+
+    if args.fen:
+        game = create_game(args.fen)
+        start = time.perf_counter()
+        if args.packed:
+            result = divide_packed(game.chessboard, args.depth)
+        else:
+            result = divide(game, args.depth)
+        elapsed = time.perf_counter() - start
+
+        for name, nodes in sorted(result.items()):
+            print(f"{name}: {nodes}")
+        total = sum(result.values())
+        print(f"\nnodes {total}  {elapsed:.2f}s  {total / max(elapsed, 1e-9):.0f} nps")
+        return
+
+    if not run_suite(args.depth, args.position, args.packed):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import re
+import time
+from typing import Iterable, Iterator, Optional, Union
+
+from src.chess_core.game import Game
+from src.chess_core.chessboard import START_FEN, ChessBoard
+from src.chess_core.bitboard import (
+    name_cord, square, square_cord, cord_name,
+    KING_INDEX, QUEEN_INDEX, ROOK_INDEX, BISHOP_INDEX, KNIGHT_INDEX, PAWN_INDEX
+)
+from src.chess_core.move_encoding import (
+    FLAG_CAPTURE, FLAG_EN_PASSANT, FLAG_CASTLE_KINGSIDE, FLAG_CASTLE_QUEENSIDE, TO_SHIFT, PROMOTION_SHIFT
+)
+from src.enums import GameStatus, MoveSpecial, PieceColor
+
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+SAN_PIECES = {"K": KING_INDEX, "Q": QUEEN_INDEX, "R": ROOK_INDEX, "B": BISHOP_INDEX, "N": KNIGHT_INDEX}
+
+# Piece, disambiguation file and rank, destination, promotion
+SAN_PATTERN = re.compile(r"^([KQRBN])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([QRBN]))?$")
+TAG_PATTERN = re.compile(r'^\[(\w+)\s+"(.*)"\]$')
+# Comment (possibly not closed on this line), rest-of-line comment, variation bounds, NAG, word
+TOKEN_PATTERN = re.compile(r"\{[^}]*\}?|;.*|\(|\)|\$\d+|[^\s{}();$]+")
+MOVE_NUMBER_PATTERN = re.compile(r"^\d+\.*")
+
+
+class PgnGame:
+    __slots__ = ("headers", "moves", "result")
+
+    def __init__(self, headers: dict[str, str], moves: list[str], result: str):
+        self.headers = headers
+        self.moves = moves
+        self.result = result
+
+
+class ReplayResult:
+    """
+    Outcome of replaying one game: the number of plies played, the status of the final
+    position and its side to move, counts of special moves and the error if a move could not be played
+    """
+    __slots__ = ("headers", "result", "plies", "status", "side_to_move", "specials", "error")
+
+    def __init__(self, headers: dict[str, str], result: str):
+        self.headers = headers
+        self.result = result
+        self.plies = 0
+        self.status = GameStatus.IN_PROGRESS
+        self.side_to_move = PieceColor.WHITE
+        self.specials: dict[MoveSpecial, int] = {}
+        self.error: Optional[str] = None
+
+
+def read_games(source: Union[str, Iterable[str]]) -> Iterator[PgnGame]:
+    """
+    Streams the games of a PGN file (path, open text file or any lines) one at a time.
+    Comments, variations and NAGs are skipped, moves stay in SAN.
+    """
+    if isinstance(source, str):
+        with open(source, encoding="utf-8", errors="replace") as file:
+            yield from read_games(file)
+        return
+
+    headers: dict[str, str] = {}
+    moves: list[str] = []
+    in_comment = False
+    depth = 0
+
+    for line in source:
+        line = line.strip()
+
+        if in_comment:
+            end = line.find("}")
+            if end < 0:
+                continue
+            line = line[end + 1:]
+            in_comment = False
+
+        if not line or line[0] == "%":
+            continue
+
+        if line[0] == "[" and depth == 0:
+            tag = TAG_PATTERN.match(line)
+            if tag:
+                # A game without a result token ends where the next one starts
+                if moves:
+                    yield PgnGame(headers, moves, headers.get("Result", "*"))
+                    headers, moves = {}, []
+                headers[tag.group(1)] = tag.group(2)
+                continue
+
+        for token in TOKEN_PATTERN.findall(line):
+            first = token[0]
+            if first == "{":
+                in_comment = token[-1] != "}"
+            elif first == ";" or first == "$":
+                continue
+            elif first == "(":
+                depth += 1
+            elif first == ")":
+                depth -= 1
+            elif depth == 0:
+                if token in RESULTS:
+                    yield PgnGame(headers, moves, token)
+                    headers, moves = {}, []
+                    continue
+                token = MOVE_NUMBER_PATTERN.sub("", token)
+                if token:
+                    moves.append(token)
+
+    if moves or headers:
+        yield PgnGame(headers, moves, headers.get("Result", "*"))
+
+
+def parse_san(chessboard: ChessBoard, san: str, moves: Optional[list[int]] = None) -> int:
+    """
+    Packed move of the side to move for a SAN string, for example Nbd7, exd6, e8=Q or O-O.
+    Raises ValueError for an illegal or ambiguous move.
+    """
+    if moves is None:
+        moves = chessboard.generate_moves()
+    text = san.rstrip("+#!?")
+
+    if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        flag = FLAG_CASTLE_KINGSIDE if len(text) == 3 else FLAG_CASTLE_QUEENSIDE
+        for move in moves:
+            if move & flag:
+                return move
+        raise ValueError(f"illegal move {san}")
+
+    match = SAN_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"bad move {san}")
+
+    piece, from_file, from_rank, destination, promotion = match.groups()
+    type_index = SAN_PIECES[piece] if piece else PAWN_INDEX
+    to_sq = square(*name_cord(destination))
+    promotion_index = SAN_PIECES[promotion] if promotion else 0
+
+    found = 0
+    for move in moves:
+        if move >> TO_SHIFT & 63 != to_sq or move >> PROMOTION_SHIFT & 7 != promotion_index:
+            continue
+        from_sq = move & 63
+        if chessboard.figure_at(from_sq).piece_index % 6 != type_index:
+            continue
+        if from_file or from_rank:
+            name = cord_name(square_cord(from_sq))
+            if from_file and name[0] != from_file or from_rank and name[1] != from_rank:
+                continue
+        if found:
+            raise ValueError(f"ambiguous move {san}")
+        found = move
+
+    if not found:
+        raise ValueError(f"illegal move {san}")
+    return found
+
+
+def replay(pgn_game: PgnGame) -> ReplayResult:
+    """
+    Plays the game through Game / ChessBoard.apply_move from its start position (or FEN tag)
+    """
+    result = ReplayResult(pgn_game.headers, pgn_game.result)
+    game = Game()
+    chessboard = game.chessboard
+    chessboard.set_fen(pgn_game.headers.get("FEN", START_FEN))
+    specials = result.specials
+
+    for san in pgn_game.moves:
+        try:
+            move = parse_san(chessboard, san)
+        except ValueError as ex:
+            result.error = f"ply {result.plies + 1}: {ex}"
+            break
+
+        game.make_move(game.packed_move_record(move))
+        result.plies += 1
+
+        if move & FLAG_EN_PASSANT:
+            special = MoveSpecial.EN_PASSANT
+        elif move & FLAG_CAPTURE:
+            special = MoveSpecial.CAPTURE
+        elif move & FLAG_CASTLE_KINGSIDE:
+            special = MoveSpecial.CASTLE_KINGSIDE
+        elif move & FLAG_CASTLE_QUEENSIDE:
+            special = MoveSpecial.CASTLE_QUEENSIDE
+        else:
+            special = None
+        if special:
+            specials[special] = specials.get(special, 0) + 1
+
+    result.side_to_move = chessboard.side_to_move
+    result.status = game.this_end(chessboard.side_to_move)
+    return result
+
+
+def replay_games(source: Union[str, Iterable[str]]) -> Iterator[ReplayResult]:
+    for pgn_game in read_games(source):
+        yield replay(pgn_game)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a PGN file through the rules and report throughput")
+    parser.add_argument("path")
+    parser.add_argument("--limit", type=int, help="stop after this many games")
+    parser.add_argument("--errors", action="store_true", help="print every game that could not be replayed")
+    args = parser.parse_args()
+
+    games = plies = errors = 0
+    start = time.perf_counter()
+    for result in replay_games(args.path):
+        games += 1
+        plies += result.plies
+        if result.error:
+            errors += 1
+            if args.errors:
+                name = f"{result.headers.get('White', '?')} - {result.headers.get('Black', '?')}"
+                print(f"game {games} ({name}): {result.error}")
+        if args.limit and games >= args.limit:
+            break
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"games {games}  errors {errors}  moves {plies}  {elapsed:.2f}s  "
+        f"{games / max(elapsed, 1e-9):.0f} games/s  {plies / max(elapsed, 1e-9):.0f} moves/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, Optional
+
+from src.chess_core.pgn import ReplayResult, read_games, replay
+from src.enums import GameStatus, MoveSpecial, PieceColor
+
+
+GAME_START = b"[Event "
+
+# Game lengths are counted in buckets of this many full moves
+LENGTH_BUCKET = 10
+
+# Illegal games and mismatches described in the stats of one chunk, the counters are always exact
+MAX_EXAMPLES = 20
+
+
+class BatchStats:
+    """
+    Statistics of replayed games, the stats of several chunks are merged into one
+    """
+    __slots__ = ("games", "plies", "illegal", "mismatches", "lengths", "specials", "statuses", "examples")
+
+    def __init__(self):
+        self.games = 0
+        self.plies = 0
+        self.illegal = 0
+        self.mismatches = 0
+        # First full move of the bucket -> games
+        self.lengths: dict[int, int] = {}
+        self.specials: dict[MoveSpecial, int] = {}
+        self.statuses: dict[GameStatus, int] = {}
+        self.examples: list[str] = []
+
+
+    def add(self, result: ReplayResult):
+        self.games += 1
+        self.plies += result.plies
+
+        bucket = (result.plies + 1) // 2 // LENGTH_BUCKET * LENGTH_BUCKET
+        self.lengths[bucket] = self.lengths.get(bucket, 0) + 1
+        for special, count in result.specials.items():
+            self.specials[special] = self.specials.get(special, 0) + count
+
+        if result.error:
+            self.illegal += 1
+            self._example(result, result.error)
+            return
+
+        self.statuses[result.status] = self.statuses.get(result.status, 0) + 1
+        expected = expected_result(result)
+        if expected is not None and result.result != expected:
+            self.mismatches += 1
+            self._example(result, f"{result.status.name.lower()} but the result is {result.result}")
+
+
+    def _example(self, result: ReplayResult, text: str):
+        if len(self.examples) < MAX_EXAMPLES:
+            headers = result.headers
+            name = f"{headers.get('White', '?')} - {headers.get('Black', '?')}"
+            if "Date" in headers:
+                name += f" {headers['Date']}"
+            self.examples.append(f"{name}: {text}")
+
+
+    def merge(self, other: "BatchStats"):
+        self.games += other.games
+        self.plies += other.plies
+        self.illegal += other.illegal
+        self.mismatches += other.mismatches
+        for table, other_table in (
+                (self.lengths, other.lengths), (self.specials, other.specials), (self.statuses, other.statuses)
+        ):
+            for key, count in other_table.items():
+                table[key] = table.get(key, 0) + count
+        self.examples.extend(other.examples[:MAX_EXAMPLES - len(self.examples)])
+
+
+def expected_result(result: ReplayResult) -> Optional[str]:
+    """
+    Result the final position forces: the mated side loses, stalemate and insufficient
+    material are draws. None when the game ended without such a position on the board,
+    repetition and the fifty-move rule only give the right to claim a draw.
+    """
+    if result.status == GameStatus.CHECKMATE:
+        return "0-1" if result.side_to_move == PieceColor.WHITE else "1-0"
+    if result.status in (GameStatus.PAT, GameStatus.INSUFFICIENT_MATERIAL):
+        return "1/2-1/2"
+    return None
+
+
+def split_chunks(path: str, chunks: int) -> list[tuple[int, int]]:
+    """
+    Byte ranges (start, end) of the file, every range starts at an [Event tag,
+    so a game is never cut between two chunks
+    """
+    size = os.path.getsize(path)
+    starts = [0]
+    with open(path, "rb") as file:
+        for index in range(1, chunks):
+            file.seek(size * index // chunks)
+            # The rest of the line we landed in
+            file.readline()
+            while True:
+                position = file.tell()
+                line = file.readline()
+                if not line:
+                    position = size
+                    break
+                if line.startswith(GAME_START):
+                    break
+            if position > starts[-1]:
+                starts.append(position)
+
+    starts = [start for start in starts if start < size] or [0]
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def chunk_lines(file: BinaryIO, end: int) -> Iterator[str]:
+    """
+    Lines from the current position of the file up to the byte offset end
+    """
+    while file.tell() < end:
+        line = file.readline()
+        if not line:
+            break
+        yield line.decode("utf-8", errors="replace")
+
+
+def replay_chunk(path: str, start: int, end: int) -> BatchStats:
+    stats = BatchStats()
+    with open(path, "rb") as file:
+        file.seek(start)
+        # Streamed, a worker never holds more than the game it replays
+        for pgn_game in read_games(chunk_lines(file, end)):
+            stats.add(replay(pgn_game))
+    return stats
+
+
+def replay_file(path: str, workers: int = os.cpu_count() or 1, chunks_per_worker: int = 4) -> BatchStats:
+    """
+    Replays a PGN file in a process pool. Several chunks per worker keep all of them busy
+    when some parts of the file hold longer games than others.
+    """
+    ranges = split_chunks(path, max(workers * chunks_per_worker, 1))
+    stats = BatchStats()
+
+    if workers <= 1:
+        for start, end in ranges:
+            stats.merge(replay_chunk(path, start, end))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(replay_chunk, path, start, end) for start, end in ranges]
+        # In file order, so the examples come out in the order of the games
+        for future in futures:
+            stats.merge(future.result())
+    return stats
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate a PGN corpus over several processes")
+    parser.add_argument("path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunks", type=int, default=4, help="chunks per worker")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = replay_file(args.path, workers=args.workers, chunks_per_worker=args.chunks)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"games {stats.games}  moves {stats.plies}  {elapsed:.2f}s  workers {args.workers}  "
+        f"{stats.games / max(elapsed, 1e-9):.0f} games/s  {stats.plies / max(elapsed, 1e-9):.0f} moves/s"
+    )
+    print(f"illegal {stats.illegal}  result mismatches {stats.mismatches}")
+    for status, count in sorted(stats.statuses.items(), key=lambda item: item[0].value):
+        print(f"  {status.name.lower():<21} {count}")
+    print("specials")
+    for special in MoveSpecial:
+        print(f"  {special.name.lower():<17} {stats.specials.get(special, 0)}")
+    print("length (full moves)")
+    for bucket in sorted(stats.lengths):
+        print(f"  {bucket:>4}-{bucket + LENGTH_BUCKET - 1:<4} {stats.lengths[bucket]}")
+    for example in stats.examples:
+        print(example)
+
+
+if __name__ == "__main__":
+    main()
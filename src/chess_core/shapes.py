@@ -1,11 +1,20 @@
-from src.enums import PieceColor, MoveSpecial
+from src.enums import PieceColor, MoveSpecial, PieceType
 from src.dataclass import Move
-from src.render import RenderComponent
+from src.chess_core.bitboard import color_index
 
 class Figure:
 
     _deltas = None
     texture_key: str
+    piece_type: PieceType = None
+    # Index inside a color (PieceType.value - 1), -1 for the base class
+    _type_index: int = -1
+
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.piece_type is not None:
+            cls._type_index = cls.piece_type.value - 1
 
 
     def __init__(self, *, x: int = 0, y: int = 0, color: PieceColor = PieceColor.WHITE, tile_size=70, texture=0):
@@ -14,7 +23,12 @@ class Figure:
 
         self.color: PieceColor = color
         self.texture = texture
-        self.renderer =  RenderComponent(texture)
+        # Attached by the UI (Render.draw_figures), the rules never touch rendering
+        self.renderer = None
+
+        # Indexes into ChessBoard.pieces / ChessBoard.occupancy bitboards
+        self.color_index = color_index(color)
+        self.piece_index = self.color_index * 6 + self._type_index if self._type_index >= 0 else -1
 
 
         self.direction = 1 if self.color == PieceColor.WHITE else -1 # The bug,  because my board
@@ -22,7 +36,13 @@ class Figure:
 
 
 
+    def attach_renderer(self, renderer):
+        self.renderer = renderer
+
+
     def draw(self):
+        if self.renderer is None:
+            return
         x, y = self.cord
         self.renderer.draw(x=x, y=y, tile_size=self.tile_size)
 
@@ -30,26 +50,18 @@ class Figure:
     def get_moves(self, *, chessboard) -> list[Move]:
         moves = []
         x, y = self.cord
-        chessboard = chessboard
-        board = chessboard.get_board()
+        occupied = chessboard.occupied
+        own = chessboard.occupancy[self.color_index]
 
 
         for dx, dy in self._deltas:
 
-            nx, ny = x + dx, y + dy
+            tx, ty = x + dx, y + dy
+            while 0 <= tx < 8 and 0 <= ty < 8:
 
-            if not chessboard.is_inside(nx, ny):
-                continue
+                target = 1 << (ty * 8 + tx)
 
-            tx, ty = nx, ny
-            while True:
-
-                if not chessboard.is_inside(tx, ty):
-                    break
-
-                target: Figure = board[ty][tx]
-
-                if target == 0:
+                if not occupied & target:
                     moves.append(
                         Move(
                             piece=self,
@@ -59,7 +71,7 @@ class Figure:
                         )
                     )
 
-                elif target.color != self.color:
+                elif not own & target:
                     moves.append(
                         Move(
                             piece=self,
@@ -88,11 +100,11 @@ class Figure:
 
 class Pawn(Figure):
     texture_key = "pawn"
+    piece_type = PieceType.PAWN
     def get_moves(self, chessboard):
         moves = []
         x, y = self.cord
         chessboard = chessboard
-        board = chessboard.get_board()
 
 
 
@@ -121,24 +133,22 @@ class Pawn(Figure):
                         )
 
 
+        enemy = chessboard.occupancy[1 - self.color_index]
+
         for dx in (-1, 1):
             nx, ny = x + dx, y + self.direction
-            if chessboard.is_inside(nx, ny) and not chessboard.is_empty(nx, ny):
-
-                target = board[ny][nx]
-
-
-
-                if target.color != self.color:
-                    moves.append(
-                        Move(
-                            piece=self,
-                            from_pos=self.cord,
-                            to_pos=(nx, ny),
-                            special=MoveSpecial.CAPTURE
-                        )
+            if chessboard.is_inside(nx, ny) and enemy >> (ny * 8 + nx) & 1:
+                moves.append(
+                    Move(
+                        piece=self,
+                        from_pos=self.cord,
+                        to_pos=(nx, ny),
+                        special=MoveSpecial.CAPTURE
                     )
-            if chessboard.en_passant_target == (nx, ny):
+                )
+
+            # The en passant target belongs to the side to move
+            if chessboard.en_passant_target == (nx, ny) and chessboard.side_to_move == self.color:
 
                 moves.append(
                     Move(
@@ -166,12 +176,13 @@ class King(Figure):
 
     _deltas = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
     texture_key = "king"
+    piece_type = PieceType.KING
 
     def get_moves(self, *, chessboard) -> list[Move]:
         moves = []
         x, y = self.cord
-        chessboard = chessboard
-        board = chessboard.get_board()
+        occupied = chessboard.occupied
+        own = chessboard.occupancy[self.color_index]
 
 
         for dx, dy in self._deltas:
@@ -181,9 +192,9 @@ class King(Figure):
             if not chessboard.is_inside(nx, ny):
                 continue
 
-            target: Figure = board[ny][nx]
+            target = 1 << (ny * 8 + nx)
 
-            if target == 0:
+            if not occupied & target:
                 moves.append(
                     Move(
                         piece=self,
@@ -193,7 +204,7 @@ class King(Figure):
                     )
                 )
 
-            elif target.color != self.color:
+            elif not own & target:
                 moves.append(
                     Move(
                         piece=self,
@@ -227,7 +238,8 @@ class King(Figure):
         if chessboard.castling_rights.can_castle_queenside(self.color):
             if (
                     chessboard.is_empty(4, rank) and
-                    chessboard.is_empty(5, rank)
+                    chessboard.is_empty(5, rank) and
+                    chessboard.is_empty(6, rank)
             ):
                 moves.append(
                     Move(
@@ -256,6 +268,7 @@ class Queen(Figure):
 
     _deltas = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
     texture_key = "queen"
+    piece_type = PieceType.QUEEN
 
     # @property
     # def texture_key(self) -> str:
@@ -270,6 +283,7 @@ class Rook(Figure):
 
     _deltas = [(-1, 0), (1, 0), (0, -1), (0, 1)]
     texture_key = "rook"
+    piece_type = PieceType.ROOK
     # @property
     # def texture_key(self) -> str:
     #     return
@@ -283,6 +297,7 @@ class Bishop(Figure):
 
     _deltas = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
     texture_key = "bishop"
+    piece_type = PieceType.BISHOP
 
     # @property
     # def texture_key(self) -> str:
@@ -296,12 +311,13 @@ class Knight(Figure):
 
     _deltas = [(-1, 2), (1, 2), (2, -1), (2, 1), (-1, -2), (1, -2), (-2, -1), (-2, 1)]
     texture_key = "knight"
+    piece_type = PieceType.KNIGHT
 
     def get_moves(self, *, chessboard) -> list[Move]:
         moves = []
         x, y = self.cord
-        chessboard = chessboard
-        board = chessboard.get_board()
+        occupied = chessboard.occupied
+        own = chessboard.occupancy[self.color_index]
 
         for dx, dy in self._deltas:
 
@@ -310,9 +326,9 @@ class Knight(Figure):
             if not chessboard.is_inside(nx, ny):
                 continue
 
-            target: Figure = board[ny][nx]
+            target = 1 << (ny * 8 + nx)
 
-            if target == 0:
+            if not occupied & target:
                 moves.append(
                     Move(
                         piece=self,
@@ -322,7 +338,7 @@ class Knight(Figure):
                     )
                 )
 
-            elif target.color != self.color:
+            elif not own & target:
                 moves.append(
                     Move(
                         piece=self,
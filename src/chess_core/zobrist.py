@@ -0,0 +1,29 @@
+import random
+
+
+# A fixed seed keeps keys identical between runs and between processes
+_rng = random.Random(0x5EED_C4E55)
+
+
+def _key() -> int:
+    return _rng.getrandbits(64)
+
+
+# PIECE_KEYS[Figure.piece_index][y * 8 + x]
+PIECE_KEYS: list[list[int]] = [[_key() for _ in range(64)] for _ in range(12)]
+
+# One key per castling right, CASTLING_KEYS[mask] is the xor of the rights in the mask
+CASTLING_RIGHT_KEYS: list[int] = [_key() for _ in range(4)]
+CASTLING_KEYS: list[int] = []
+for _mask in range(16):
+    _value = 0
+    for _right in range(4):
+        if _mask >> _right & 1:
+            _value ^= CASTLING_RIGHT_KEYS[_right]
+    CASTLING_KEYS.append(_value)
+
+# Keyed by the x of the en passant target square
+EN_PASSANT_KEYS: list[int] = [_key() for _ in range(8)]
+
+# Xored in when black is to move
+SIDE_KEY: int = _key()
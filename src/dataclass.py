@@ -14,12 +14,45 @@ class Move:
     special: Optional[MoveSpecial] = None  # "castle_kingside", "castle_queenside", "en_passant", "promotion_pawn", "capture"
 
 
-@dataclass
+def _castling_right(flag: int) -> property:
+    def getter(self) -> bool:
+        return bool(self.mask & flag)
+
+    def setter(self, value: bool):
+        self.mask = self.mask | flag if value else self.mask & ~flag
+
+    return property(getter, setter)
+
+
 class CastlingRights:
-    white_king_side: bool = True
-    white_queen_side: bool = True
-    black_king_side: bool = True
-    black_queen_side: bool = True
+    """
+    Castling rights packed into 4 bits, so saving and restoring them is a copy of one int
+    """
+    __slots__ = ("mask",)
+
+    WHITE_KING_SIDE = 1
+    WHITE_QUEEN_SIDE = 2
+    BLACK_KING_SIDE = 4
+    BLACK_QUEEN_SIDE = 8
+
+    def __init__(
+            self,
+            white_king_side: bool = True,
+            white_queen_side: bool = True,
+            black_king_side: bool = True,
+            black_queen_side: bool = True
+    ):
+        self.mask = (
+            white_king_side * self.WHITE_KING_SIDE
+            | white_queen_side * self.WHITE_QUEEN_SIDE
+            | black_king_side * self.BLACK_KING_SIDE
+            | black_queen_side * self.BLACK_QUEEN_SIDE
+        )
+
+    white_king_side = _castling_right(WHITE_KING_SIDE)
+    white_queen_side = _castling_right(WHITE_QUEEN_SIDE)
+    black_king_side = _castling_right(BLACK_KING_SIDE)
+    black_queen_side = _castling_right(BLACK_QUEEN_SIDE)
 
     def can_castle_kingside(self, color: PieceColor):
         return (
@@ -35,9 +68,18 @@ class CastlingRights:
             else self.black_queen_side
         )
 
+    def __eq__(self, other):
+        return isinstance(other, CastlingRights) and self.mask == other.mask
 
+    def __repr__(self):
+        return (
+            f"CastlingRights(white_king_side={self.white_king_side}, white_queen_side={self.white_queen_side}, "
+            f"black_king_side={self.black_king_side}, black_queen_side={self.black_queen_side})"
+        )
 
-@dataclass
+
+
+@dataclass(slots=True)
 class MoveRecord:
     piece: "Figure"
     from_pos: tuple[int, int]
@@ -50,11 +92,33 @@ class MoveRecord:
     rook_from: Optional[tuple[int, int]] = None
     rook_to: Optional[tuple[int, int]] = None
 
-    prev_castling_rights: CastlingRights = None
+    prev_castling_rights: int = 0 # CastlingRights.mask
     prev_en_passant: Optional[tuple[int, int]] = None
+    prev_halfmove_clock: int = 0
 
     promotion_pawn: Optional["Figure"] = None
 
+    prev_zobrist_key: int = 0
+
+
+
+class UndoRecord:
+    """
+    What ChessBoard.make_move needs to take back a packed move.
+    Castling rights are a CastlingRights.mask and the en passant cell is a square index or -1.
+    """
+    __slots__ = ("move", "piece", "captured", "promoted", "castling", "en_passant", "zobrist_key", "halfmove_clock")
+
+    def __init__(self, move: int, piece: "Figure", castling: int, en_passant: int, zobrist_key: int, halfmove_clock: int):
+        self.move = move
+        self.piece = piece
+        self.captured: Optional["Figure"] = None
+        self.promoted: Optional["Figure"] = None
+        self.castling = castling
+        self.en_passant = en_passant
+        self.zobrist_key = zobrist_key
+        self.halfmove_clock = halfmove_clock
+
 
 
 @dataclass
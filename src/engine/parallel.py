@@ -0,0 +1,182 @@
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+from src.chess_core.chessboard import ChessBoard
+from src.engine.search import Search, SearchResult, MAX_PLY
+from src.engine.transposition import TranspositionTable, DEFAULT_SIZE_MB
+
+
+# Helper i searches in an aspiration window of i * HELPER_WINDOW centipawns, worker 0 with the full window
+HELPER_WINDOW = 25
+
+class ParallelResult:
+    __slots__ = ("best_move", "score", "depth", "pv", "worker_nodes", "elapsed", "speedup")
+
+    def __init__(self, best_move: int, score: int, depth: int, pv: list[int], worker_nodes: list[int], elapsed: float):
+        self.best_move = best_move
+        self.score = score
+        self.depth = depth
+        self.pv = pv
+        self.worker_nodes = worker_nodes
+        self.elapsed = elapsed
+        # Single-core time / parallel time to the same depth, set by compare_with_single
+        self.speedup: Optional[float] = None
+
+    @property
+    def nodes(self) -> int:
+        return sum(self.worker_nodes)
+
+    @property
+    def nps(self) -> int:
+        return int(self.nodes / self.elapsed) if self.elapsed > 0 else 0
+
+    def __repr__(self):
+        return (
+            f"ParallelResult(best_move={self.best_move}, score={self.score}, depth={self.depth}, "
+            f"worker_nodes={self.worker_nodes}, nps={self.nps}, speedup={self.speedup})"
+        )
+
+
+def _worker(
+        worker_id: int, fen: str, keys: list[int], shm_name: str, tt_mb: float,
+        max_depth: int, max_nodes: Optional[int], max_time: Optional[float],
+        stop_event, results
+):
+    shm = SharedMemory(name=shm_name)
+    tt = TranspositionTable(tt_mb, shm.buf)
+    try:
+        chessboard = ChessBoard()
+        chessboard.set_fen(fen)
+        # The fen alone forgets the game, repetitions need the positions before it
+        chessboard.set_repetition_keys(keys)
+        # Lazy SMP: odd helpers start one ply deeper and every helper has its own aspiration window,
+        # so the workers do not all walk the same tree in the same order
+        result = Search(chessboard, tt=tt, stop_event=stop_event).search(
+            max_depth=max_depth, max_nodes=max_nodes, max_time=max_time,
+            start_depth=1 + worker_id % 2, aspiration=worker_id * HELPER_WINDOW or None
+        )
+        results.put((worker_id, result.best_move, result.score, result.depth, result.pv, result.nodes))
+    finally:
+        tt.release()
+        shm.close()
+
+
+def parallel_search(
+        chessboard: ChessBoard,
+        workers: int = os.cpu_count() or 1,
+        max_depth: int = MAX_PLY,
+        max_nodes: Optional[int] = None,
+        max_time: Optional[float] = None,
+        tt_mb: float = DEFAULT_SIZE_MB
+) -> ParallelResult:
+    """
+    Lazy SMP: every worker process searches its own copy of the position and all of them
+    share one transposition table in shared memory. The search ends when worker 0 ends,
+    the deepest finished iteration among the workers gives the move.
+    max_nodes is the budget of every worker.
+    """
+    fen = chessboard.get_fen()
+    keys = chessboard.repetition_keys()
+    context = multiprocessing.get_context()
+    stop_event = context.Event()
+    results = context.Queue()
+
+    shm = SharedMemory(create=True, size=TranspositionTable.buffer_size(tt_mb))
+    start = time.perf_counter()
+    try:
+        processes = [
+            context.Process(
+                target=_worker,
+                args=(worker_id, fen, keys, shm.name, tt_mb, max_depth, max_nodes, max_time, stop_event, results),
+                daemon=True
+            )
+            for worker_id in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        reports = {}
+        while len(reports) < workers:
+            try:
+                report = results.get(timeout=0.1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    break
+                continue
+            reports[report[0]] = report
+            if report[0] == 0:
+                stop_event.set()
+
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        shm.close()
+        shm.unlink()
+
+    if not reports:
+        raise RuntimeError("no search worker finished")
+
+    # Deepest iteration wins, worker 0 on a tie
+    _, best_move, score, depth, pv, _ = max(reports.values(), key=lambda report: (report[3], -report[0]))
+    worker_nodes = [reports[worker_id][5] if worker_id in reports else 0 for worker_id in range(workers)]
+    return ParallelResult(best_move, score, depth, pv, worker_nodes, elapsed)
+
+
+def compare_with_single(chessboard: ChessBoard, depth: int, workers: int = os.cpu_count() or 1,
+                        tt_mb: float = DEFAULT_SIZE_MB) -> tuple[SearchResult, ParallelResult]:
+    """
+    Searches the position to a fixed depth on one core and then in parallel,
+    speedup is the ratio of the times to reach that depth
+    """
+    copy = ChessBoard()
+    copy.set_fen(chessboard.get_fen())
+    copy.set_repetition_keys(chessboard.repetition_keys())
+    single = Search(copy, tt=TranspositionTable(tt_mb)).search(max_depth=depth)
+    parallel = parallel_search(chessboard, workers=workers, max_depth=depth, tt_mb=tt_mb)
+    parallel.speedup = single.elapsed / parallel.elapsed if parallel.elapsed > 0 else None
+    return single, parallel
+
+
+def main():
+    import argparse
+    from src.chess_core.chessboard import START_FEN
+    from src.chess_core.move_encoding import move_name
+
+    parser = argparse.ArgumentParser(description="Lazy SMP search over several processes")
+    parser.add_argument("--fen", default=START_FEN)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--depth", type=int, default=MAX_PLY)
+    parser.add_argument("--nodes", type=int, help="per worker")
+    parser.add_argument("--time", type=float, help="seconds")
+    parser.add_argument("--hash", type=float, default=DEFAULT_SIZE_MB, help="shared transposition table size in MB")
+    parser.add_argument("--compare", action="store_true", help="also search to --depth on one core and print the speedup")
+    args = parser.parse_args()
+
+    chessboard = ChessBoard()
+    chessboard.set_fen(args.fen)
+
+    if args.compare:
+        single, result = compare_with_single(chessboard, args.depth, args.workers, args.hash)
+        print(f"single    depth {single.depth}  nodes {single.nodes}  {single.elapsed:.2f}s  nps {single.nps}")
+    else:
+        max_time = args.time if args.time is not None or args.nodes or args.depth < MAX_PLY else 5.0
+        result = parallel_search(
+            chessboard, workers=args.workers, max_depth=args.depth,
+            max_nodes=args.nodes, max_time=max_time, tt_mb=args.hash
+        )
+
+    print(f"parallel  depth {result.depth}  nodes {result.nodes}  {result.elapsed:.2f}s  nps {result.nps}")
+    for worker_id, nodes in enumerate(result.worker_nodes):
+        print(f"  worker {worker_id:>2}  nodes {nodes}")
+    if result.speedup is not None:
+        print(f"speedup {result.speedup:.2f}x")
+    print(f"bestmove {move_name(result.best_move)}  score {result.score}  pv {' '.join(move_name(move) for move in result.pv)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+import time
+from typing import Callable, Optional
+
+from src.chess_core.chessboard import ChessBoard, FIFTY_MOVES_PLIES
+from src.chess_core.evaluation import evaluate, PIECE_VALUES
+from src.chess_core.bitboard import KING_INDEX, PAWN_INDEX, color_index
+from src.chess_core.move_encoding import FLAG_CAPTURE, FLAG_EN_PASSANT, TO_SHIFT, PROMOTION_SHIFT
+from src.engine.transposition import TranspositionTable, DEFAULT_SIZE_MB
+
+
+INFINITY = 1_000_000
+MATE = 100_000
+MAX_PLY = 128
+
+# Transposition table bounds
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+NULL_MOVE_REDUCTION = 2
+# Delta pruning: a capture is skipped if even this much on top of the captured piece can't reach alpha
+DELTA_MARGIN = 200
+# Nodes between two checks of the time / node budget
+CHECK_EVERY = 1024
+
+
+class SearchStopped(Exception):
+    pass
+
+
+class SearchResult:
+    __slots__ = ("best_move", "score", "depth", "pv", "nodes", "elapsed")
+
+    def __init__(self, best_move: int, score: int, depth: int, pv: list[int], nodes: int, elapsed: float):
+        self.best_move = best_move
+        self.score = score
+        self.depth = depth
+        self.pv = pv
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def nps(self) -> int:
+        return int(self.nodes / self.elapsed) if self.elapsed > 0 else 0
+
+    def __repr__(self):
+        return (
+            f"SearchResult(best_move={self.best_move}, score={self.score}, depth={self.depth}, "
+            f"nodes={self.nodes}, nps={self.nps})"
+        )
+
+
+class Search:
+    """
+    Negamax alpha-beta with iterative deepening over ChessBoard packed moves.
+
+    Moves come from ChessBoard.iter_moves in stages: hash move, MVV-LVA captures,
+    killer moves, quiet moves by the history heuristic.
+    Pruning: null move pruning and late move reductions.
+    Leaves are resolved by a quiescence search over captures with stand pat, delta
+    pruning and pruning of captures that lose material by static exchange evaluation.
+    """
+
+    def __init__(self, chessboard: ChessBoard, tt: Optional[TranspositionTable] = None, stop_event=None):
+        self.chessboard = chessboard
+        self.tt = tt if tt is not None else TranspositionTable()
+        # Anything with is_set(), for example a multiprocessing.Event shared by parallel workers
+        self.stop_event = stop_event
+
+        self.nodes = 0
+        self.stopped = False
+        self._deadline: Optional[float] = None
+        self._max_nodes: Optional[int] = None
+
+        self._killers = [[0, 0] for _ in range(MAX_PLY)]
+        self._history = [[0] * 64 for _ in range(64)]
+        self._pv = [[] for _ in range(MAX_PLY + 1)]
+
+
+    def stop(self):
+        """
+        Asks a running search (for example in another thread) to return its last finished iteration
+        """
+        self.stopped = True
+
+
+    def search(
+            self,
+            max_depth: int = MAX_PLY,
+            max_nodes: Optional[int] = None,
+            max_time: Optional[float] = None,
+            on_iteration: Optional[Callable[[SearchResult], None]] = None,
+            start_depth: int = 1,
+            aspiration: Optional[int] = None
+    ) -> SearchResult:
+        """
+        Iterative deepening until max_depth, max_nodes or max_time seconds.
+        on_iteration is called with the result of every finished depth.
+        start_depth > 1 skips the first iterations (helper workers of a parallel search).
+        aspiration searches a depth in a window of that many centipawns around the score
+        of the previous one, widened on a fail; None always uses the full window.
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.stopped = False
+        self._deadline = start + max_time if max_time is not None else None
+        self._max_nodes = max_nodes
+        self._killers = [[0, 0] for _ in range(MAX_PLY)]
+        self._history = [[0] * 64 for _ in range(64)]
+        self.tt.new_search()
+
+        root_moves = self.chessboard.generate_moves()
+        result = SearchResult(root_moves[0] if root_moves else 0, 0, 0, [], 0, 0.0)
+        if not root_moves:
+            result.score = -MATE if self.chessboard.in_check() else 0
+            return result
+
+        for depth in range(min(start_depth, max_depth), max_depth + 1):
+            try:
+                if aspiration and result.depth and abs(result.score) < MATE - MAX_PLY:
+                    score = self._aspiration(depth, result.score, aspiration)
+                else:
+                    score = self._negamax(depth, -INFINITY, INFINITY, 0, True)
+            except SearchStopped:
+                break
+
+            pv = list(self._pv[0])
+            result = SearchResult(
+                pv[0] if pv else result.best_move, score, depth, pv,
+                self.nodes, time.perf_counter() - start
+            )
+            if on_iteration:
+                on_iteration(result)
+
+            if abs(score) >= MATE - MAX_PLY:
+                break
+
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+
+    def _aspiration(self, depth: int, guess: int, window: int) -> int:
+        alpha = max(guess - window, -INFINITY)
+        beta = min(guess + window, INFINITY)
+        while True:
+            score = self._negamax(depth, alpha, beta, 0, True)
+            # Fail-soft: the score is a bound to widen from
+            if score <= alpha:
+                alpha = max(score - window, -INFINITY)
+            elif score >= beta:
+                beta = min(score + window, INFINITY)
+            else:
+                return score
+            window *= 2
+
+
+    def _check_limits(self):
+        if self.stopped:
+            raise SearchStopped
+        if self.stop_event is not None and self.stop_event.is_set():
+            self.stopped = True
+            raise SearchStopped
+        if self._max_nodes is not None and self.nodes >= self._max_nodes:
+            self.stopped = True
+            raise SearchStopped
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            self.stopped = True
+            raise SearchStopped
+
+
+    def _negamax(self, depth: int, alpha: int, beta: int, ply: int, allow_null: bool) -> int:
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            self._check_limits()
+
+        chessboard = self.chessboard
+        self._pv[ply] = []
+
+        # Draw by repetition (already the first one) or by the fifty-move rule
+        if ply > 0 and (chessboard.halfmove_clock >= FIFTY_MOVES_PLIES or chessboard.is_repetition()):
+            return 0
+
+        key = chessboard.zobrist_key
+        hash_move = 0
+        entry = self.tt.probe(key)
+        if entry is not None:
+            entry_depth, entry_score, bound, hash_move = entry
+            if ply > 0 and entry_depth >= depth:
+                entry_score = score_from_tt(entry_score, ply)
+                if (
+                        bound == EXACT
+                        or bound == LOWER and entry_score >= beta
+                        or bound == UPPER and entry_score <= alpha
+                ):
+                    return entry_score
+
+        if ply >= MAX_PLY:
+            return evaluate(chessboard)
+        if depth <= 0:
+            return self._quiescence(alpha, beta, ply)
+
+        in_check = chessboard.in_check()
+
+        # Null move: if passing still fails high the position is good enough to cut
+        if (
+                allow_null and not in_check and depth >= 3 and ply > 0
+                and beta < MATE - MAX_PLY and self._has_pieces(chessboard)
+        ):
+            chessboard.make_null_move()
+            try:
+                score = -self._negamax(depth - 1 - NULL_MOVE_REDUCTION, -beta, -beta + 1, ply + 1, False)
+            finally:
+                chessboard.unmake_null_move()
+            if score >= beta:
+                return beta
+
+        history = self._history
+        moves = chessboard.iter_moves(
+            hash_move, self._killers[ply], lambda move: history[move & 63][move >> TO_SHIFT & 63]
+        )
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = 0
+
+        for index, move in enumerate(moves):
+            quiet = not move & (FLAG_CAPTURE | FLAG_EN_PASSANT) and not move >> PROMOTION_SHIFT & 7
+
+            # The board is unwound by finally when SearchStopped goes up the stack
+            chessboard.make_move(move)
+            try:
+                # Late move reductions for quiet moves that come late in the ordering
+                if index >= 3 and depth >= 3 and quiet and not in_check and not chessboard.in_check():
+                    score = -self._negamax(depth - 2, -alpha - 1, -alpha, ply + 1, True)
+                    if score > alpha:
+                        score = -self._negamax(depth - 1, -beta, -alpha, ply + 1, True)
+                else:
+                    score = -self._negamax(depth - 1, -beta, -alpha, ply + 1, True)
+            finally:
+                chessboard.unmake_move()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+
+            if score > alpha:
+                alpha = score
+                self._pv[ply] = [move] + self._pv[ply + 1]
+
+            if alpha >= beta:
+                if quiet:
+                    killers = self._killers[ply]
+                    if killers[0] != move:
+                        killers[1] = killers[0]
+                        killers[0] = move
+                    self._history[move & 63][move >> TO_SHIFT & 63] += depth * depth
+                break
+
+        if not best_move:
+            return -MATE + ply if in_check else 0
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+
+        self.tt.store(key, depth, score_to_tt(best_score, ply), bound, best_move)
+
+        return best_score
+
+
+    def _quiescence(self, alpha: int, beta: int, ply: int) -> int:
+        """
+        Captures only until the position is quiet. In check all evasions are searched.
+        """
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            self._check_limits()
+
+        chessboard = self.chessboard
+        if ply >= MAX_PLY:
+            return evaluate(chessboard)
+
+        in_check = chessboard.in_check()
+        if in_check:
+            moves = chessboard.generate_moves()
+            if not moves:
+                return -MATE + ply
+            best_score = -INFINITY
+            stand_pat = 0
+        else:
+            # The side to move doesn't have to capture
+            stand_pat = evaluate(chessboard)
+            if stand_pat >= beta:
+                return stand_pat
+            if stand_pat > alpha:
+                alpha = stand_pat
+            best_score = stand_pat
+            moves = chessboard.generate_moves(captures_only=True)
+
+        moves.sort(key=chessboard.capture_order, reverse=True)
+
+        for move in moves:
+            if not in_check and not move >> PROMOTION_SHIFT & 7:
+                if move & FLAG_EN_PASSANT:
+                    victim_value = PIECE_VALUES[PAWN_INDEX]
+                else:
+                    victim_value = PIECE_VALUES[chessboard.figure_at(move >> TO_SHIFT & 63).piece_index % 6]
+                if stand_pat + victim_value + DELTA_MARGIN <= alpha:
+                    continue
+                if chessboard.see(move) < 0:
+                    continue
+
+            chessboard.make_move(move)
+            try:
+                score = -self._quiescence(-beta, -alpha, ply + 1)
+            finally:
+                chessboard.unmake_move()
+
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+
+        return best_score
+
+
+    @staticmethod
+    def _has_pieces(chessboard: ChessBoard) -> bool:
+        """
+        Null move is unsafe in pawn endings (zugzwang), so it needs a figure besides king and pawns
+        """
+        offset = color_index(chessboard.side_to_move) * 6
+        pieces = chessboard.pieces
+        return any(pieces[offset + index] for index in range(6) if index not in (KING_INDEX, PAWN_INDEX))
+
+
+def score_to_tt(score: int, ply: int) -> int:
+    """
+    Mate scores are stored relative to the node, not to the root
+    """
+    if score >= MATE - MAX_PLY:
+        return score + ply
+    if score <= -MATE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def score_from_tt(score: int, ply: int) -> int:
+    if score >= MATE - MAX_PLY:
+        return score - ply
+    if score <= -MATE + MAX_PLY:
+        return score + ply
+    return score
+
+
+def main():
+    import argparse
+    from src.chess_core.chessboard import START_FEN
+    from src.chess_core.move_encoding import move_name
+
+    parser = argparse.ArgumentParser(description="Search one position and print every iteration")
+    parser.add_argument("--fen", default=START_FEN)
+    parser.add_argument("--depth", type=int, default=MAX_PLY)
+    parser.add_argument("--nodes", type=int)
+    parser.add_argument("--time", type=float, default=5.0, help="seconds")
+    parser.add_argument("--hash", type=float, default=DEFAULT_SIZE_MB, help="transposition table size in MB")
+    args = parser.parse_args()
+
+    chessboard = ChessBoard()
+    chessboard.set_fen(args.fen)
+
+    def report(result: SearchResult):
+        pv = " ".join(move_name(move) for move in result.pv)
+        print(f"depth {result.depth:>2}  score {result.score:>6}  nodes {result.nodes:>9}  nps {result.nps:>7}  pv {pv}")
+
+    tt = TranspositionTable(args.hash)
+    result = Search(chessboard, tt=tt).search(
+        max_depth=args.depth, max_nodes=args.nodes, max_time=args.time, on_iteration=report
+    )
+    print(f"bestmove {move_name(result.best_move)}  nodes {result.nodes}  nps {result.nps}")
+    print("hash " + "  ".join(f"{name} {value}" for name, value in tt.stats().items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+from typing import Optional
+
+
+# Bytes per entry: two 64-bit words
+ENTRY_SIZE = 16
+
+# Entries per bucket: slot 0 keeps the deepest result, slot 1 is always replaced
+BUCKET_SLOTS = 2
+BUCKET_SIZE = ENTRY_SIZE * BUCKET_SLOTS
+
+DEFAULT_SIZE_MB = 16
+
+# Packed entry data:
+#   bits 0-19   move (packed, see move_encoding)
+#   bits 20-40  score + SCORE_OFFSET
+#   bits 41-48  depth
+#   bits 49-50  bound
+#   bits 51-56  generation
+SCORE_OFFSET = 1 << 20
+SCORE_SHIFT = 20
+DEPTH_SHIFT = 41
+BOUND_SHIFT = 49
+GENERATION_SHIFT = 51
+GENERATIONS = 64
+MOVE_MASK = 0xFFFFF
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of packed entries in a flat buffer of 64-bit words, the memory
+    is allocated once and never grows however long the analysis runs.
+
+    An entry is stored as (key ^ data, data). A reader in another process that
+    sees half of a concurrent write gets a key mismatch instead of wrong data,
+    so the buffer can be shared between search processes without locks.
+
+    A key maps to a bucket of two slots: a depth-preferred slot which is only replaced
+    by a deeper result or once its entry is from an older search, and a slot which is
+    always replaced. new_search starts a new generation, which ages all stored entries.
+    """
+
+    def __init__(self, size_mb: float = DEFAULT_SIZE_MB, buffer=None):
+        self.buckets = max(int(size_mb * 1024 * 1024) // BUCKET_SIZE, 1)
+        self.entries = self.buckets * BUCKET_SLOTS
+        self._buffer = buffer if buffer is not None else bytearray(self.buckets * BUCKET_SIZE)
+        # A shared memory block may be longer than asked for
+        self._view = memoryview(self._buffer)[:self.buckets * BUCKET_SIZE]
+        self._words = self._view.cast("Q")
+        self.generation = 0
+
+        # Counters of this process, also when the buffer is shared
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        # Stores that overwrote another position of the current search
+        self.collisions = 0
+
+
+    @staticmethod
+    def buffer_size(size_mb: float) -> int:
+        return max(int(size_mb * 1024 * 1024) // BUCKET_SIZE, 1) * BUCKET_SIZE
+
+
+    @property
+    def size_mb(self) -> float:
+        return self.buckets * BUCKET_SIZE / (1024 * 1024)
+
+
+    def new_search(self):
+        self.generation = (self.generation + 1) % GENERATIONS
+
+
+    def probe(self, key: int) -> Optional[tuple[int, int, int, int]]:
+        """
+        Returns (depth, score, bound, move) or None
+        """
+        self.probes += 1
+        words = self._words
+        index = key % self.buckets * 4
+
+        data = words[index + 1]
+        if words[index] ^ data != key:
+            data = words[index + 3]
+            if words[index + 2] ^ data != key or not data:
+                return None
+        elif not data:
+            return None
+
+        self.hits += 1
+        return (
+            data >> DEPTH_SHIFT & 0xFF,
+            (data >> SCORE_SHIFT & 0x1FFFFF) - SCORE_OFFSET,
+            data >> BOUND_SHIFT & 3,
+            data & MOVE_MASK
+        )
+
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: int):
+        self.stores += 1
+        words = self._words
+        index = key % self.buckets * 4
+        generation = self.generation
+
+        old = words[index + 1]
+        if words[index] ^ old == key and old:
+            # Same position: keep a deeper result of this search in the depth-preferred slot
+            if depth < (old >> DEPTH_SHIFT & 0xFF) and (old >> GENERATION_SHIFT) == generation:
+                index += 2
+                old = words[index + 1]
+                if words[index] ^ old != key:
+                    old = 0
+        elif (
+                old and (old >> GENERATION_SHIFT) == generation
+                and depth < (old >> DEPTH_SHIFT & 0xFF)
+        ):
+            index += 2
+            old = words[index + 1]
+            if words[index] ^ old != key:
+                if old and (old >> GENERATION_SHIFT) == generation:
+                    self.collisions += 1
+                old = 0
+        else:
+            if old and (old >> GENERATION_SHIFT) == generation:
+                self.collisions += 1
+            old = 0
+
+        # A result without a move keeps the move found before for the same position
+        if not move and old:
+            move = old & MOVE_MASK
+
+        data = (
+            move
+            | (score + SCORE_OFFSET) << SCORE_SHIFT
+            | depth << DEPTH_SHIFT
+            | bound << BOUND_SHIFT
+            | generation << GENERATION_SHIFT
+        )
+        words[index] = key ^ data
+        words[index + 1] = data
+
+
+    def hashfull(self) -> int:
+        """
+        Permille of the first 1000 entries used by the current search (UCI hashfull)
+        """
+        words = self._words
+        sample = min(self.entries, 1000)
+        used = 0
+        for entry in range(sample):
+            data = words[entry * 2 + 1]
+            if data and data >> GENERATION_SHIFT == self.generation:
+                used += 1
+        return used * 1000 // sample
+
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "stores": self.stores,
+            "collisions": self.collisions,
+            "hashfull": self.hashfull()
+        }
+
+
+    def clear(self):
+        self._buffer[:] = bytes(len(self._buffer))
+        self.generation = 0
+        self.probes = self.hits = self.stores = self.collisions = 0
+
+
+    def release(self):
+        """
+        Drops the view of the buffer, needed before closing a shared memory block
+        """
+        self._words.release()
+        self._view.release()
@@ -0,0 +1,270 @@
+import sys
+import threading
+from typing import Optional
+
+from src.chess_core.chessboard import START_FEN
+from src.chess_core.game import Game
+from src.chess_core.book import OpeningBook
+from src.chess_core.move_encoding import move_name
+from src.engine.search import Search, SearchResult, MATE, MAX_PLY
+from src.engine.transposition import TranspositionTable, DEFAULT_SIZE_MB
+from src.enums import PieceColor
+
+
+ENGINE_NAME = "GameChess"
+ENGINE_AUTHOR = "LakusDVV"
+
+MAX_HASH_MB = 4096
+
+# Moves to go assumed by the clock when the GUI doesn't send movestogo
+DEFAULT_MOVES_TO_GO = 30
+
+
+def score_text(score: int) -> str:
+    if abs(score) >= MATE - MAX_PLY:
+        plies = MATE - abs(score)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score}"
+
+
+def info_line(result: SearchResult, hashfull: Optional[int] = None) -> str:
+    pv = " ".join(move_name(move) for move in result.pv)
+    hash_text = f" hashfull {hashfull}" if hashfull is not None else ""
+    return (
+        f"info depth {result.depth} score {score_text(result.score)} nodes {result.nodes} "
+        f"nps {result.nps}{hash_text} time {int(result.elapsed * 1000)} pv {pv}"
+    )
+
+
+class UciEngine:
+    """
+    Universal Chess Interface over the chess core and Search.
+    The search runs in a thread, so the reader keeps handling stop, isready and quit.
+    """
+    def __init__(self, output=None):
+        self.output = output or sys.stdout
+        self._output_lock = threading.Lock()
+
+        self.game = Game()
+        self.game.chessboard.set_fen(START_FEN)
+        self.search: Optional[Search] = None
+        self.hash_mb = DEFAULT_SIZE_MB
+        self.book: Optional[OpeningBook] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Cleared by the search thread right before it sends bestmove
+        self._searching = threading.Event()
+
+
+    def send(self, text: str):
+        with self._output_lock:
+            self.output.write(text + "\n")
+            self.output.flush()
+
+
+    def loop(self, input_stream=None):
+        for line in input_stream or sys.stdin:
+            if not self.handle(line):
+                break
+        self.stop_search()
+
+
+    def handle(self, line: str) -> bool:
+        """
+        Handles one command, returns False on quit
+        """
+        words = line.split()
+        if not words:
+            return True
+
+        match words[0]:
+            case "uci":
+                self.send(f"id name {ENGINE_NAME}")
+                self.send(f"id author {ENGINE_AUTHOR}")
+                self.send(f"option name Hash type spin default {DEFAULT_SIZE_MB} min 1 max {MAX_HASH_MB}")
+                self.send("option name BookFile type string default <empty>")
+                self.send("uciok")
+            case "isready":
+                self.send("readyok")
+            case "setoption":
+                self.stop_search()
+                self.set_option(words[1:])
+            case "ucinewgame":
+                self.stop_search()
+                if self.search is not None:
+                    self.search.tt.clear()
+            case "position":
+                self.stop_search()
+                self.set_position(words[1:])
+            case "go":
+                self.go(words[1:])
+            case "stop":
+                self.stop_search()
+            case "quit":
+                return False
+            case "d":
+                self.send(self.game.chessboard.get_fen())
+        return True
+
+
+    def set_option(self, words: list[str]):
+        """
+        setoption name Hash value <MB>, the table is allocated again on the next go
+        setoption name BookFile value <path>, <empty> turns the book off
+        """
+        if "value" not in words:
+            return
+        index = words.index("value")
+        name = " ".join(words[1:index]).lower()
+        value = " ".join(words[index + 1:])
+
+        if name == "hash":
+            try:
+                size = int(value)
+            except ValueError:
+                self.send(f"info string wrong hash size {value}")
+                return
+            self.hash_mb = min(max(size, 1), MAX_HASH_MB)
+            self.search = None
+
+        elif name == "bookfile":
+            if self.book is not None:
+                self.book.close()
+                self.book = None
+            if value and value != "<empty>":
+                try:
+                    self.book = OpeningBook(value)
+                except OSError as ex:
+                    self.send(f"info string can't open book {value}: {ex}")
+
+
+    def set_position(self, words: list[str]):
+        """
+        position startpos [moves ...] or position fen <fen> [moves ...],
+        the moves are played with ChessBoard.make_move, Game only takes the final position
+        """
+        if "moves" in words:
+            index = words.index("moves")
+            setup, moves = words[:index], words[index + 1:]
+        else:
+            setup, moves = words, []
+
+        if setup and setup[0] == "fen":
+            fen = " ".join(setup[1:])
+        else:
+            fen = START_FEN
+
+        game = Game()
+        try:
+            game.chessboard.set_fen(fen)
+        except ValueError as ex:
+            # The previous position stays
+            self.send(f"info string {ex}")
+            return
+
+        # A GUI sends the whole game every time: no legal move tables or status checks per ply
+        chessboard = game.chessboard
+        for name in moves:
+            legal = {move_name(move): move for move in chessboard.generate_moves()}
+            move = legal.get(name)
+            if move is None:
+                self.send(f"info string illegal move {name}")
+                break
+            chessboard.make_move(move)
+
+        game.has_move = chessboard.side_to_move
+        game.game_status = game.this_end(game.has_move)
+        self.game = game
+
+
+    def go(self, words: list[str]):
+        if self._searching.is_set():
+            self.send("info string search already running")
+            return
+        if self._thread is not None:
+            self._thread.join()
+
+        options = {}
+        infinite = False
+        index = 0
+        while index < len(words):
+            word = words[index]
+            if word == "infinite":
+                infinite = True
+            elif index + 1 < len(words) and words[index + 1].lstrip("-").isdigit():
+                options[word] = int(words[index + 1])
+                index += 1
+            index += 1
+
+        # A book move is played at once, unless the GUI wants to analyse
+        if not infinite and self.book is not None:
+            move = self.book.choose(self.game.chessboard)
+            if move:
+                self.send(f"info string book move {move_name(move)}")
+                self.send(f"bestmove {move_name(move)}")
+                return
+
+        max_depth = options.get("depth", MAX_PLY)
+        max_nodes = options.get("nodes")
+        max_time = self._time_budget(options) if not infinite else None
+
+        if self.search is None:
+            self.search = Search(
+                self.game.chessboard, tt=TranspositionTable(self.hash_mb), stop_event=self._stop_event
+            )
+        self.search.chessboard = self.game.chessboard
+        self._stop_event.clear()
+        self._searching.set()
+
+        self._thread = threading.Thread(
+            target=self._run_search, args=(max_depth, max_nodes, max_time, infinite), daemon=True
+        )
+        self._thread.start()
+
+
+    def _time_budget(self, options: dict) -> Optional[float]:
+        if "movetime" in options:
+            return options["movetime"] / 1000
+
+        side = "w" if self.game.chessboard.side_to_move == PieceColor.WHITE else "b"
+        clock = options.get(f"{side}time")
+        if clock is None:
+            return None
+
+        increment = options.get(f"{side}inc", 0)
+        moves_to_go = options.get("movestogo", DEFAULT_MOVES_TO_GO)
+        budget = clock / max(moves_to_go, 1) + increment * 3 / 4
+        # Keep a margin for the GUI and the process
+        return max(min(budget, clock - 50), 10) / 1000
+
+
+    def _run_search(self, max_depth: int, max_nodes: Optional[int], max_time: Optional[float], infinite: bool):
+        result = self.search.search(
+            max_depth=max_depth, max_nodes=max_nodes, max_time=max_time,
+            on_iteration=lambda iteration: self.send(info_line(iteration, self.search.tt.hashfull()))
+        )
+        # In infinite mode bestmove is only sent after stop
+        if infinite:
+            self._stop_event.wait()
+
+        self._searching.clear()
+        if result.best_move:
+            self.send(f"bestmove {move_name(result.best_move)}")
+        else:
+            self.send("bestmove 0000")
+
+
+    def stop_search(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+
+def main():
+    UciEngine().loop()
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,9 @@ class GameStatus(Enum):
     IN_PROGRESS = auto()
     PAT = auto()
     CHECKMATE = auto()
+    THREEFOLD_REPETITION = auto()
+    FIFTY_MOVES = auto()
+    INSUFFICIENT_MATERIAL = auto()
     EXIT = auto()
 
 class ClickResult(Enum):
@@ -1,11 +1,31 @@
+import multiprocessing
+import queue
+from typing import Optional
+
 import raylibpy as rl
 from src.render import Render, TextureManager
 from src.chess_core.game import Game
+from src.enums import GameStatus
+from src.workers import EngineWorker, ConsoleReader
+
+
+# Seconds the loop sleeps between two input polls when nothing has to be redrawn
+IDLE_WAIT = 1 / 60
 
 
 class Game_UI:
-    def __init__(self):
+    def __init__(self, event_driven: bool = True, book_path: Optional[str] = None):
         self.chess_game = Game()
+        if book_path:
+            self.chess_game.open_book(book_path)
+        # Redraw only when the game or the render state changed, sleep between input polls otherwise
+        self.event_driven = event_driven
+        self.running = True
+
+        # Console lines and engine results, drained by update without blocking
+        self.messages = multiprocessing.Queue()
+        self.engine = EngineWorker(self.messages)
+        self.console = ConsoleReader(self.messages)
 
 
 
@@ -19,26 +39,43 @@ class Game_UI:
         rl.init_window(width, height, "Chess")
         rl.set_target_fps(60)
 
-        self.texture_manager = TextureManager()
+        self.texture_manager = TextureManager(tile_size=self.tile_size)
         self.texture_manager.load_textures()
 
         self.render = Render(chessboard=self.chess_game.get_chessboard(), texture_manager=self.texture_manager)
 
 
         self.chess_game.create_figures(texture_manager= self.texture_manager)
+        self.console.start()
 
 
 
 
     def run(self):
-        while not rl.window_should_close():
-            self.render.draw()
+        while self.running and not rl.window_should_close():
+            if not self.event_driven or self.needs_redraw():
+                self.render.draw()
+                self.render.dirty = False
+                self.chess_game.dirty = False
+            else:
+                # Not raylib event waiting: that would also block the console and engine messages
+                rl.poll_input_events()
+                rl.wait_time(IDLE_WAIT)
             self.update()
 
+        self.engine.close()
+        self.render.unload()
+        self.texture_manager.unload()
         rl.close_window()
 
 
+    def needs_redraw(self) -> bool:
+        return self.render.dirty or self.chess_game.dirty or rl.is_window_resized()
+
+
     def update(self):
+        self.process_messages()
+
         mouse_x = rl.get_mouse_x()
         mouse_y = rl.get_mouse_y()
 
@@ -50,3 +87,57 @@ class Game_UI:
             board_y = mouse_y // self.tile_size
 
             status = self.chess_game.update(x=board_x, y=board_y)
+
+
+    def process_messages(self):
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                return
+
+            match message:
+                case ("console", text):
+                    self.handle_command(text)
+
+                case ("bestmove", tag, move, score, depth):
+                    self.engine.finished()
+                    chessboard = self.chess_game.chessboard
+                    # The position may have changed while the engine was thinking
+                    if tag != chessboard.zobrist_key or not move or not chessboard.is_legal(move):
+                        print("engine: position changed, move dropped")
+                        continue
+                    print(f"engine: depth {depth} score {score}")
+                    if self.chess_game.game_status == GameStatus.IN_PROGRESS:
+                        self.chess_game.make_packed_move(move)
+
+
+    def handle_command(self, text: str):
+        """
+        go [seconds]  the engine plays a move for the side to move, from the book if there is one
+        halt          the engine plays the best move found so far
+        stop          closes the game
+        x y           selects a cell like a click
+        """
+        words = text.split()
+        if not words:
+            return
+
+        match words[0].lower():
+            case "go":
+                move = self.chess_game.book_move()
+                if move:
+                    self.chess_game.make_packed_move(move)
+                    return
+                try:
+                    max_time = float(words[1]) if len(words) > 1 else 5.0
+                except ValueError:
+                    print(f"Error wrong time {words[1]}")
+                    return
+                if not self.engine.think(self.chess_game.chessboard, max_time=max_time):
+                    print("engine is busy")
+            case "halt":
+                self.engine.stop()
+            case _:
+                if self.chess_game.update(command=text) == GameStatus.EXIT:
+                    self.running = False
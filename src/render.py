@@ -10,53 +10,78 @@ if TYPE_CHECKING:
     from src.chess_core.chessboard import ChessBoard
 
 class RenderComponent:
-    def __init__(self, texture):
-        self.texture = texture
+    def __init__(self, texture_manager: "TextureManager", key: str):
+        self.texture_manager = texture_manager
+        self.key = key
 
 
     def draw(self, *, x, y, tile_size):
-        rl.draw_texture(
-            texture=self.texture,
-            pos_x=x * tile_size,
-            pos_y=y * tile_size,
-            tint= rl.WHITE
-        )
+        self.texture_manager.draw(self.key, x * tile_size, y * tile_size)
+
+
+# Atlas key -> image file, every image is one tile
+IMAGES = {
+    "black_king":    "black_king.png",
+    "black_queen":   "black_queen.png",
+    "black_rook":    "black_rook.png",
+    "black_bishop":  "black_bishop.png",
+    "black_knight":  "black_knight.png",
+    "black_pawn":    "black_pawn.png",
+    "white_king":    "white_king.png",
+    "white_queen":   "white_queen.png",
+    "white_rook":    "white_rook.png",
+    "white_bishop":  "white_bishop.png",
+    "white_knight":  "white_knight.png",
+    "white_pawn":    "white_pawn.png",
+    "highlighting":  "highlighting_texture.png",
+}
 
 
 class TextureManager:
-    def __init__(self):
-        self._textures = {}
+    """
+    All images packed into one atlas texture, so every piece is drawn
+    from the same texture through its source rectangle
+    """
+    def __init__(self, tile_size: int = 70):
+        self.tile_size = tile_size
+        self.atlas = None
+        self._regions: dict[str, rl.Rectangle] = {}
 
 
     def load_textures(self):
-        self._load("black_king",    "black_king.png")
-        self._load("black_queen",   "black_queen.png")
-        self._load("black_rook",    "black_rook.png")
-        self._load("black_bishop",  "black_bishop.png")
-        self._load("black_knight",  "black_knight.png")
-        self._load("black_pawn",    "black_pawn.png")
-        self._load("white_king",    "white_king.png")
-        self._load("white_queen",   "white_queen.png")
-        self._load("white_rook",    "white_rook.png")
-        self._load("white_bishop",  "white_bishop.png")
-        self._load("white_knight",  "white_knight.png")
-        self._load("white_pawn",    "white_pawn.png")
-        self._load("highlighting",  "highlighting_texture.png")
-
-
-    def _load(self, key: str, filename: str):
-        path = os.path.join(IMAGES_DIR, filename)
-
         if not rl.is_window_ready():
             raise RuntimeError("Window not initialized before loading texture")
 
-        texture = rl.load_texture(path)
-        assert texture.id != 0, f"Failed to load texture: {path}"
-        self._textures[key] = texture
+        size = self.tile_size
+        atlas_image = rl.gen_image_color(size * len(IMAGES), size, rl.BLANK)
+
+        for index, (key, filename) in enumerate(IMAGES.items()):
+            path = os.path.join(IMAGES_DIR, filename)
+            image = rl.load_image(path)
+            assert image.width != 0, f"Failed to load image: {path}"
+
+            region = rl.Rectangle(index * size, 0, size, size)
+            rl.image_draw(atlas_image, image, rl.Rectangle(0, 0, image.width, image.height), region, rl.WHITE)
+            rl.unload_image(image)
+            self._regions[key] = region
+
+        self.atlas = rl.load_texture_from_image(atlas_image)
+        rl.unload_image(atlas_image)
+        assert self.atlas.id != 0, "Failed to create the texture atlas"
+
 
+    def get_region(self, name) -> rl.Rectangle:
+        return self._regions[name]
 
-    def get_texture(self, name):
-        return self._textures[name]
+
+    def draw(self, name: str, pos_x: int, pos_y: int):
+        rl.draw_texture_rec(self.atlas, self._regions[name], rl.Vector2(pos_x, pos_y), rl.WHITE)
+
+
+    def unload(self):
+        if self.atlas is not None:
+            rl.unload_texture(self.atlas)
+            self.atlas = None
 
 
 class Render:
@@ -76,6 +101,10 @@ class Render:
 
         self._chessboard: ChessBoard = chessboard
         self.texture_manager = texture_manager
+        # The tiles never change, they are drawn once into this render texture
+        self._tile_layer = None
+        # Set by every change_* / clear_* call, the UI only redraws dirty frames
+        self.dirty = True
         self.light_color = rl.Color(r=240, g=217, b=181, a=255)
         self.dark_color = rl.Color(r=181, g=136, b=99, a=255)
 
@@ -155,7 +184,23 @@ class Render:
         """
         Draw tiles
         """
+        if self._tile_layer is None:
+            self._tile_layer = self._create_tile_layer()
+
+        width = self.cols * self.tile_size
+        height = self.rows * self.tile_size
+        # Render textures are stored upside down, a negative height flips them back
+        rl.draw_texture_rec(
+            self._tile_layer.texture,
+            rl.Rectangle(0, 0, width, -height),
+            rl.Vector2(0, 0),
+            rl.WHITE
+        )
 
+
+    def _create_tile_layer(self):
+        layer = rl.load_render_texture(self.cols * self.tile_size, self.rows * self.tile_size)
+        rl.begin_texture_mode(layer)
         for y in range(self.cols):
             for x in range(self.rows):
                 color = self.get_tile_color(x, y)
@@ -166,20 +211,35 @@ class Render:
                     height= self.tile_size,
                     color= color
                 )
+        rl.end_texture_mode()
+        return layer
+
+
+    def unload(self):
+        if self._tile_layer is not None:
+            rl.unload_render_texture(self._tile_layer)
+            self._tile_layer = None
 
 
     def draw_figures(self) -> None:
 
-        figures = self._chessboard.get_figures()
+        for figures in self._chessboard.piece_sets:
+            for fig in figures:
+                if fig.renderer is None:
+                    self.attach_renderer(fig)
+                fig.draw()
+
 
-        for fig in figures:
-            fig.draw()
+    def attach_renderer(self, fig) -> None:
+        """
+        Gives a figure created by the chess core (without textures) its texture
+        """
+        fig.attach_renderer(RenderComponent(self.texture_manager, f"{fig.color}_{fig.texture_key}"))
 
 
 
     # highlighting moves block <
     def draw_highlighting(self) -> None:
-        highlighting_texture = self.texture_manager.get_texture("highlighting")
         cel_x, cel_y = self.highlighting_of_the_selected_cell_data["data"]
         tr = self.highlighting_of_the_selected_cell_data["has_data"]
 
@@ -191,12 +251,7 @@ class Render:
                     continue
 
 
-                rl.draw_texture(
-                    texture=highlighting_texture,
-                    pos_x=tx,
-                    pos_y=ty,
-                    tint=rl.WHITE
-                )
+                self.texture_manager.draw("highlighting", tx, ty)
 
             for nx, ny in self.highlighting_data["moves"]:
                 cx = nx * self.tile_size + self.tile_size // 2
@@ -213,6 +268,7 @@ class Render:
 
 
     def change_highlighting_data(self, captures: list, moves: list):
+        self.dirty = True
         if captures or moves:
             self.highlighting_data["has_data"] = True
             self.highlighting_data["captures"] = captures
@@ -220,6 +276,7 @@ class Render:
 
 
     def clear_highlighting_data(self):
+        self.dirty = True
         self.highlighting_data["has_data"] = False
     # highlighting moves block >
 
@@ -239,11 +296,13 @@ class Render:
 
 
     def change_highlighting_selected_cell_data(self, cord:tuple[int, int]):
+        self.dirty = True
         self.highlighting_the_selected_cell_data["data"] = cord
         self.highlighting_the_selected_cell_data["has_data"] = True
 
 
     def clear_highlighting_selected_cell_data(self):
+        self.dirty = True
         self.highlighting_the_selected_cell_data["has_data"] = False
 
     # highlighting selected cell block >
@@ -264,11 +323,13 @@ class Render:
 
 
     def change_highlighting_of_the_selected_cell_data(self, cord: tuple[int, int]):
+        self.dirty = True
         self.highlighting_of_the_selected_cell_data["data"] = cord
         self.highlighting_of_the_selected_cell_data["has_data"] = True
 
 
     def clear_highlighting_of_the_selected_cell_data(self):
+        self.dirty = True
         self.highlighting_of_the_selected_cell_data["has_data"] = False
     # highlighting selected cell block >
 
@@ -288,11 +349,13 @@ class Render:
 
 
     def change_check_data(self, new_pos: tuple[int, int]):
+        self.dirty = True
         self.check_data["data"] = new_pos
         self.check_data["has_data"] = True
 
 
     def clear_check_data(self):
+        self.dirty = True
         self.check_data["data"] = ()
         self.check_data["has_data"] = False
     # check king block >
@@ -304,50 +367,20 @@ class Render:
         if self.promotion_pawn_data["has_data"]:
             data = self.promotion_pawn_data["data"]
 
-            if data["color"] == PieceColor.WHITE:
-                queen_t = self.texture_manager.get_texture("white_queen")
-                knight_t = self.texture_manager.get_texture("white_knight")
-                rook_t = self.texture_manager.get_texture("white_rook")
-                bishop_t = self.texture_manager.get_texture("white_bishop")
-            else:
-                queen_t = self.texture_manager.get_texture("black_queen")
-                knight_t = self.texture_manager.get_texture("black_knight")
-                rook_t = self.texture_manager.get_texture("black_rook")
-                bishop_t = self.texture_manager.get_texture("black_bishop")
-
+            color = data["color"]
             x, y = data["cord"]
             direct = data["direction"]
 
-
-            rl.draw_texture(
-                texture=queen_t,
-                pos_x=x * self.tile_size,
-                pos_y=y * self.tile_size,
-                tint=rl.WHITE
-            )
-
-            rl.draw_texture(
-                texture=knight_t,
-                pos_x=x * self.tile_size,
-                pos_y=(y - direct * 1) * self.tile_size,
-                tint=rl.WHITE
-            )
-
-            rl.draw_texture(
-                texture=rook_t,
-                pos_x=x * self.tile_size,
-                pos_y=(y - direct * 2) * self.tile_size,
-                tint=rl.WHITE
-            )
-            rl.draw_texture(
-                texture=bishop_t,
-                pos_x=x * self.tile_size,
-                pos_y=(y - direct * 3) * self.tile_size,
-                tint=rl.WHITE
-            )
+            for offset, name in enumerate(("queen", "knight", "rook", "bishop")):
+                self.texture_manager.draw(
+                    f"{color}_{name}",
+                    x * self.tile_size,
+                    (y - direct * offset) * self.tile_size
+                )
 
 
     def change_promotion_pawn_data(self, color: PieceColor, direction: int, cord: tuple[int, int]):
+        self.dirty = True
         self.promotion_pawn_data["has_data"] = True
         self.promotion_pawn_data["data"]["color"] = color
         self.promotion_pawn_data["data"]["direction"] = direction
@@ -355,6 +388,7 @@ class Render:
 
 
     def clear_promotion_pawn_data(self):
+        self.dirty = True
         self.promotion_pawn_data["has_data"] = False
     # promotion pawn block >
 
@@ -374,11 +408,13 @@ class Render:
 
 
     def change_last_move_data(self, from_pos: tuple[int, int], to_pos: tuple[int, int]):
+        self.dirty = True
         self.last_move_data["data"] = [from_pos, to_pos]
         self.last_move_data["has_data"] = True
 
 
     def clear_last_move_data(self):
+        self.dirty = True
         self.last_move_data["has_data"] = False
     # last move block >
 
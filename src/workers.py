@@ -0,0 +1,93 @@
+import multiprocessing
+import threading
+
+from src.chess_core.chessboard import ChessBoard
+from src.engine.search import Search, MAX_PLY
+
+
+def _think(fen: str, keys: list[int], tag: int, max_time: float, max_depth: int, stop_event, messages):
+    chessboard = ChessBoard()
+    chessboard.set_fen(fen)
+    chessboard.set_repetition_keys(keys)
+    result = Search(chessboard, stop_event=stop_event).search(max_depth=max_depth, max_time=max_time)
+    messages.put(("bestmove", tag, result.best_move, result.score, result.depth))
+
+
+class EngineWorker:
+    """
+    Runs one search at a time in a separate process, so it never holds the GIL
+    of the render loop. The result is put on messages as ("bestmove", tag, move, score, depth),
+    tag is the zobrist key of the searched position.
+    """
+    def __init__(self, messages):
+        self.messages = messages
+        self._context = multiprocessing.get_context()
+        self._stop_event = self._context.Event()
+        self._process = None
+        self.busy = False
+
+
+    def think(self, chessboard: ChessBoard, max_time: float = 5.0, max_depth: int = MAX_PLY) -> bool:
+        """
+        Searches a copy of the position, with the keys of the game so far for repetitions
+        """
+        if self.busy:
+            return False
+
+        self.busy = True
+        self._stop_event.clear()
+        self._process = self._context.Process(
+            target=_think,
+            args=(
+                chessboard.get_fen(), chessboard.repetition_keys(), chessboard.zobrist_key,
+                max_time, max_depth, self._stop_event, self.messages
+            ),
+            daemon=True
+        )
+        self._process.start()
+        return True
+
+
+    def finished(self):
+        """
+        Called when the result was taken from messages, the process exits on its own
+        """
+        self.busy = False
+        self._process = None
+
+
+    def stop(self):
+        """
+        The search returns its last finished iteration
+        """
+        self._stop_event.set()
+
+
+    def close(self):
+        self.stop()
+        if self._process is not None:
+            self._process.join(timeout=1)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        self.busy = False
+
+
+class ConsoleReader(threading.Thread):
+    """
+    Reads console lines in the background and puts them on messages as ("console", text)
+    """
+    def __init__(self, messages, prompt: str = "> "):
+        super().__init__(daemon=True)
+        self.messages = messages
+        self.prompt = prompt
+
+
+    def run(self):
+        while True:
+            try:
+                text = input(self.prompt)
+            except EOFError:
+                self.messages.put(("console", "stop"))
+                return
+            self.messages.put(("console", text.strip()))
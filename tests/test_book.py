@@ -0,0 +1,35 @@
+from src.chess_core.book import OpeningBook, build_book, polyglot_key
+from src.chess_core.chessboard import ChessBoard, START_FEN
+from src.chess_core.move_encoding import move_name
+
+
+def board(fen: str) -> ChessBoard:
+    chessboard = ChessBoard()
+    chessboard.set_fen(fen)
+    return chessboard
+
+
+def test_polyglot_key_of_start_position():
+    assert polyglot_key(board(START_FEN)) == 0x463B96181691FC9C
+
+
+def test_polyglot_keys_of_the_format_description():
+    # Positions from the Polyglot book format description
+    keys = {
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1": 0x823C9B50FD114196,
+        "rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 2": 0x0756B94461C50FB0,
+        "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3": 0x22A48B5A8E47FF78,
+        "rnbq1bnr/ppp1pkpp/8/3pPp2/8/8/PPPPKPPP/RNBQ1BNR w - - 0 4": 0x00FDD303C946BDD9,
+    }
+    for fen, key in keys.items():
+        assert polyglot_key(board(fen)) == key, fen
+
+
+def test_built_book_is_found(tmp_path):
+    pgn = tmp_path / "games.pgn"
+    pgn.write_text('[Event "?"]\n\n1. e4 e5 2. Nf3 *\n\n[Event "?"]\n\n1. e4 c5 *\n')
+    book_path = tmp_path / "book.bin"
+    build_book(str(pgn), str(book_path))
+
+    with OpeningBook(str(book_path)) as book:
+        assert [(move_name(move), weight) for move, weight in book.moves(board(START_FEN))] == [("e2e4", 2)]
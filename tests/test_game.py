@@ -0,0 +1,47 @@
+from src.chess_core.bitboard import name_cord
+from src.chess_core.game import Game
+from src.enums import PieceColor
+
+
+def new_game(fen: str) -> Game:
+    game = Game()
+    game.chessboard.set_fen(fen)
+    game.has_move = game.chessboard.side_to_move
+    return game
+
+
+def click_move(game: Game, from_name: str, to_name: str):
+    game.selected_cell(*name_cord(from_name))
+    assert game.selected_cell(*name_cord(to_name))["num_of_select"] == 1
+
+
+def test_click_move_passes_the_turn():
+    game = new_game("4k3/8/8/8/8/8/8/1N2K1N1 w - - 0 1")
+    click_move(game, "g1", "f3")
+    assert game.has_move == PieceColor.BLACK
+    assert all(move.piece.color == PieceColor.BLACK for move in game.moves_by_path.values())
+
+
+def test_cached_moves_follow_swapped_knights():
+    game = new_game("4k3/8/8/8/8/8/8/1N2K1N1 w - - 0 1")
+    game.update_legal_moves(PieceColor.WHITE)
+
+    # The knights of b1 and g1 swap cells, the position and its key come back
+    for from_name, to_name in [
+        ("b1", "d2"), ("e8", "d8"), ("g1", "e2"), ("d8", "e8"),
+        ("d2", "f1"), ("e8", "d8"), ("e2", "c3"), ("d8", "e8"),
+        ("f1", "g3"), ("e8", "d8"), ("c3", "b1"), ("d8", "e8"),
+        ("g3", "e2"), ("e8", "d8"), ("e2", "g1"), ("d8", "e8"),
+    ]:
+        click_move(game, from_name, to_name)
+
+    game.update_legal_moves(PieceColor.WHITE)
+    board = game.chessboard.get_board()
+    for (from_x, from_y), moves in game.moves_by_from.items():
+        assert all(move.piece is board[from_y][from_x] for move in moves)
+
+    click_move(game, "g1", "f3")
+    assert game.chessboard.get_fen().startswith("4k3/8/8/8/8/5N2/8/1N2K3 b")
+    x, y = name_cord("f3")
+    assert board[y][x].cord == (x, y)
+    assert game.chessboard.zobrist_key == game.chessboard.compute_zobrist_key()
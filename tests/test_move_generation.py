@@ -0,0 +1,81 @@
+import pytest
+
+from src.chess_core.bitboard import KNIGHT_INDEX, PAWN_INDEX, QUEEN_INDEX
+from src.chess_core.chessboard import ChessBoard
+from src.chess_core.evaluation import PIECE_VALUES
+from src.chess_core.move_encoding import move_name
+from src.chess_core.perft import POSITIONS
+
+
+FENS = [position["fen"] for position in POSITIONS]
+
+
+def board(fen: str) -> ChessBoard:
+    chessboard = ChessBoard()
+    chessboard.set_fen(fen)
+    return chessboard
+
+
+def positions(fen: str):
+    """
+    The position and every position one move after it
+    """
+    chessboard = board(fen)
+    yield chessboard
+    for move in chessboard.generate_moves():
+        chessboard.make_move(move)
+        yield chessboard
+        chessboard.unmake_move()
+
+
+@pytest.mark.parametrize("fen", FENS)
+def test_iter_moves_matches_generate_moves(fen):
+    for chessboard in positions(fen):
+        legal = chessboard.generate_moves()
+        staged = list(chessboard.iter_moves())
+        assert len(staged) == len(set(staged))
+        assert set(staged) == set(legal), chessboard.get_fen()
+
+        # The hash move and killers come first and are not repeated later
+        if legal:
+            hash_move, killer = legal[-1], legal[0]
+            staged = list(chessboard.iter_moves(hash_move, [killer]))
+            assert staged[0] == hash_move
+            assert sorted(staged) == sorted(legal)
+
+
+@pytest.mark.parametrize("fen", FENS)
+def test_is_legal(fen):
+    # Moves of the other positions of the suite, most of them not legal here
+    candidates = {move for other in FENS for move in board(other).generate_moves()}
+    for chessboard in positions(fen):
+        legal = set(chessboard.generate_moves())
+        for move in legal | candidates:
+            assert chessboard.is_legal(move) == (move in legal), (chessboard.get_fen(), move_name(move))
+
+
+def see(fen: str, name: str) -> int:
+    chessboard = board(fen)
+    moves = {move_name(move): move for move in chessboard.generate_moves()}
+    return chessboard.see(moves[name])
+
+
+def test_see_undefended_capture():
+    assert see("4k3/8/8/3n4/4P3/8/8/4K3 w - - 0 1", "e4d5") == PIECE_VALUES[KNIGHT_INDEX]
+    assert see("4k3/8/3p4/8/8/8/3Q4/4K3 w - - 0 1", "d2d6") == PIECE_VALUES[PAWN_INDEX]
+
+
+def test_see_defended_pawn():
+    # QxP, PxQ
+    assert see("4k3/2p5/3p4/8/8/8/3Q4/4K3 w - - 0 1", "d2d6") == (
+        PIECE_VALUES[PAWN_INDEX] - PIECE_VALUES[QUEEN_INDEX]
+    )
+
+
+def test_see_exchanges():
+    # Examples of the Chess Programming Wiki
+    assert see("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1", "e1e5") == PIECE_VALUES[PAWN_INDEX]
+    # The knight is lost for the pawn, x-ray attackers join behind the first ones
+    assert see("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1", "d3e5") == (
+        PIECE_VALUES[PAWN_INDEX] - PIECE_VALUES[KNIGHT_INDEX]
+    )
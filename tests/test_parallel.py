@@ -0,0 +1,46 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from src.chess_core.chessboard import ChessBoard
+from src.engine import parallel
+from src.engine.search import Search
+from src.engine.transposition import TranspositionTable
+
+
+FEN = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+def test_two_workers_return_a_legal_move_and_free_the_table(monkeypatch):
+    names = []
+
+    class RecordedSharedMemory(SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            if kwargs.get("create"):
+                names.append(self.name)
+
+    monkeypatch.setattr(parallel, "SharedMemory", RecordedSharedMemory)
+
+    chessboard = ChessBoard()
+    chessboard.set_fen(FEN)
+    result = parallel.parallel_search(chessboard, workers=2, max_depth=3, tt_mb=1)
+
+    assert result.best_move in chessboard.generate_moves()
+    assert result.depth == 3
+    assert len(result.worker_nodes) == 2 and all(result.worker_nodes)
+    assert chessboard.get_fen() == FEN
+
+    assert len(names) == 1
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=names[0])
+
+
+def test_aspiration_window_finds_the_same_move():
+    results = []
+    for aspiration in (None, parallel.HELPER_WINDOW):
+        chessboard = ChessBoard()
+        chessboard.set_fen(FEN)
+        result = Search(chessboard, tt=TranspositionTable(1)).search(max_depth=4, aspiration=aspiration)
+        results.append((result.best_move, result.score))
+    assert results[0] == results[1]
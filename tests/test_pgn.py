@@ -0,0 +1,111 @@
+import io
+
+import pytest
+
+from src.chess_core.chessboard import ChessBoard
+from src.chess_core.epd import parse_epd, read_epd, to_epd
+from src.chess_core.move_encoding import FLAG_EN_PASSANT, move_name
+from src.chess_core.pgn import parse_san, read_games, replay_games
+from src.chess_core.pgn_batch import replay_file
+from src.enums import GameStatus, MoveSpecial
+
+
+def board(fen: str) -> ChessBoard:
+    chessboard = ChessBoard()
+    chessboard.set_fen(fen)
+    return chessboard
+
+
+@pytest.mark.parametrize("fen, san, name", [
+    ("4k3/8/8/8/8/8/8/1N2KN2 w - - 0 1", "Nbd2", "b1d2"),
+    ("4k3/8/8/8/8/8/8/1N2KN2 w - - 0 1", "Nfd2", "f1d2"),
+    ("4k3/8/8/R7/8/8/8/R3K3 w - - 0 1", "R5a3", "a5a3"),
+    ("4k3/8/8/R7/8/8/8/R3K3 w - - 0 1", "R1a3+", "a1a3"),
+    ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "O-O", "e1g1"),
+    ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", "O-O-O", "e8c8"),
+    ("3r3k/4P3/8/8/8/8/8/4K3 w - - 0 1", "e8=Q+", "e7e8q"),
+    ("3r3k/4P3/8/8/8/8/8/4K3 w - - 0 1", "exd8N", "e7d8n"),
+    ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "exd6", "e5d6"),
+])
+def test_parse_san(fen, san, name):
+    move = parse_san(board(fen), san)
+    assert move_name(move) == name
+
+
+def test_en_passant_flag():
+    assert parse_san(board("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1"), "exd6") & FLAG_EN_PASSANT
+
+
+@pytest.mark.parametrize("san", ["Nd2", "Ra3", "Ke3x", "Qd1"])
+def test_parse_san_rejects(san):
+    with pytest.raises(ValueError):
+        parse_san(board("4k3/8/8/R7/8/8/8/RN2KN2 w - - 0 1"), san)
+
+
+GAMES = """[Event "first"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Bc4 {aims at f7} Nc6 3. Qh5 Nf6?? (3... g6 4. Qf3) 4. Qxf7# 1-0
+
+[Event "second"]
+[Result "1/2-1/2"]
+
+1. e4 d5 2. exd5 Qxd5 3. Nc3 Qd8 4. d4 $1 c6 5. d5 e5 6. dxe6 Bxe6 1/2-1/2
+
+[Event "third"]
+[Result "*"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bc4 Nf6 4. O-O Nxe4 5. Kh1 *
+
+[Event "fourth"]
+[FEN "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"]
+[Result "*"]
+
+1. a8=Q+ Kd7 2. Qb7+ Ke6 3. Ke2 *
+
+[Event "fifth"]
+[Result "0-1"]
+
+1. e4 e5 2. Nf3 Nxe4 0-1
+"""
+
+
+def test_read_games():
+    games = list(read_games(io.StringIO(GAMES)))
+    assert [game.headers["Event"] for game in games] == ["first", "second", "third", "fourth", "fifth"]
+    assert games[0].moves == ["e4", "e5", "Bc4", "Nc6", "Qh5", "Nf6??", "Qxf7#"]
+    assert games[0].result == "1-0"
+
+
+def test_replay_games():
+    results = list(replay_games(io.StringIO(GAMES)))
+    assert results[0].status == GameStatus.CHECKMATE
+    assert results[1].specials == {MoveSpecial.CAPTURE: 3, MoveSpecial.EN_PASSANT: 1}
+    assert results[2].specials[MoveSpecial.CASTLE_KINGSIDE] == 1
+    assert results[3].plies == 5 and not results[3].error
+    assert results[4].error == "ply 4: illegal move Nxe4"
+
+
+def test_batch_gives_the_same_stats_on_two_workers(tmp_path):
+    path = tmp_path / "games.pgn"
+    path.write_text(GAMES * 3)
+
+    single = replay_file(str(path), workers=1)
+    double = replay_file(str(path), workers=2, chunks_per_worker=2)
+    assert single.games == double.games == 15
+    for name in ("plies", "illegal", "mismatches", "lengths", "specials", "statuses", "examples"):
+        assert getattr(single, name) == getattr(double, name), name
+    assert single.illegal == 3
+
+
+def test_epd_operations():
+    line = 'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - bm Bb5; id "ruy; lopez"; hmvc 2; fmvn 3;'
+    fen, operations = parse_epd(line)
+    assert fen == "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+    assert operations == {"bm": "Bb5", "id": "ruy; lopez", "hmvc": "2", "fmvn": "3"}
+
+    positions = [(chessboard.get_fen(), ops) for chessboard, ops in read_epd(io.StringIO(f"# test\n\n{line}\n"))]
+    assert positions == [(fen, operations)]
+    assert parse_epd(to_epd(board(fen), {"bm": "Bb5", "id": "ruy lopez"}))[1] == {"bm": "Bb5", "id": "ruy lopez"}
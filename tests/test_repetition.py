@@ -0,0 +1,39 @@
+from src.chess_core.chessboard import ChessBoard, START_FEN
+from src.chess_core.move_encoding import move_name
+from src.enums import GameStatus
+
+
+KNIGHTS_OUT_AND_BACK = ["g1f3", "g8f6", "f3g1", "f6g8"]
+
+
+def play(chessboard: ChessBoard, names: list[str]):
+    for name in names:
+        moves = {move_name(move): move for move in chessboard.generate_moves()}
+        chessboard.make_move(moves[name])
+
+
+def test_repetition_after_double_push_without_en_passant_capture():
+    chessboard = ChessBoard()
+    chessboard.set_fen(START_FEN)
+    play(chessboard, ["e2e4", "e7e5"])
+    first = chessboard.zobrist_key
+
+    play(chessboard, KNIGHTS_OUT_AND_BACK)
+    assert chessboard.zobrist_key == first
+    play(chessboard, KNIGHTS_OUT_AND_BACK)
+
+    assert chessboard.repetition_count() == 2
+    assert chessboard.get_status(chessboard.side_to_move) == GameStatus.THREEFOLD_REPETITION
+
+
+def test_en_passant_key_only_when_capture_possible():
+    chessboard = ChessBoard()
+    chessboard.set_fen("rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 3")
+    capturable = chessboard.zobrist_key
+    chessboard.set_fen("rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 3")
+    assert chessboard.zobrist_key != capturable
+
+    chessboard.set_fen("rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2")
+    not_capturable = chessboard.zobrist_key
+    chessboard.set_fen("rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2")
+    assert chessboard.zobrist_key == not_capturable
@@ -0,0 +1,47 @@
+from src.chess_core.chessboard import ChessBoard
+from src.chess_core.move_encoding import move_name
+from src.engine.search import Search, MATE
+from src.engine.transposition import TranspositionTable
+
+
+def search(fen: str, **limits):
+    chessboard = ChessBoard()
+    chessboard.set_fen(fen)
+    result = Search(chessboard, tt=TranspositionTable(1)).search(**limits)
+    # The search takes back every move it makes
+    assert chessboard.get_fen() == fen
+    return result
+
+
+def test_mate_in_one():
+    result = search("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1", max_depth=4)
+    assert move_name(result.best_move) == "a1a8"
+    assert result.score == MATE - 1
+
+
+def test_mate_in_two():
+    result = search("3r2k1/5ppp/8/8/8/8/4RPPP/4R1K1 w - - 0 1", max_depth=4)
+    assert move_name(result.best_move) == "e2e8"
+    assert result.score == MATE - 3
+
+
+def test_stalemate_scores_zero():
+    result = search("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1", max_depth=3)
+    assert result.best_move == 0
+    assert result.score == 0
+
+
+def test_quiescence_sees_the_recapture():
+    # Qxe5+ wins a pawn at depth 1, but fxe5 takes the queen back
+    result = search("4k3/8/5p2/4p3/8/8/4Q3/4K3 w - - 0 1", max_depth=1)
+    assert move_name(result.best_move) != "e2e5"
+    assert result.score > 0
+
+
+def test_node_budget():
+    chessboard = ChessBoard()
+    chessboard.set_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    result = Search(chessboard, tt=TranspositionTable(1)).search(max_nodes=3000)
+    assert result.best_move in chessboard.generate_moves()
+    # Limits are checked every CHECK_EVERY nodes
+    assert result.nodes < 3000 + 1024
@@ -0,0 +1,61 @@
+from src.engine.search import score_to_tt, score_from_tt, MATE, EXACT, LOWER, UPPER
+from src.engine.transposition import TranspositionTable, BUCKET_SIZE
+
+
+KEY = 0x0123456789ABCDEF
+
+
+def one_bucket() -> TranspositionTable:
+    return TranspositionTable(BUCKET_SIZE / (1024 * 1024))
+
+
+def test_store_and_probe():
+    tt = TranspositionTable(1)
+    tt.store(KEY, 5, -120, LOWER, 1234)
+    assert tt.probe(KEY) == (5, -120, LOWER, 1234)
+    assert tt.probe(KEY ^ 1) is None
+    assert (tt.probes, tt.hits, tt.stores) == (2, 1, 1)
+
+
+def test_torn_entry_is_rejected():
+    tt = TranspositionTable(1)
+    tt.store(KEY, 5, 30, EXACT, 1234)
+    index = KEY % tt.buckets * 4
+    # Data of another write next to the key of this one
+    tt._words[index + 1] ^= 1 << 20
+    assert tt.probe(KEY) is None
+
+
+def test_deeper_entry_is_kept():
+    tt = one_bucket()
+    other = KEY + 1
+    tt.store(KEY, 8, 10, EXACT, 1)
+    tt.store(other, 2, 20, EXACT, 2)
+
+    # The shallow result went to the always-replace slot
+    assert tt.probe(KEY) == (8, 10, EXACT, 1)
+    assert tt.probe(other) == (2, 20, EXACT, 2)
+    assert tt.collisions == 0
+
+
+def test_old_entries_are_replaced():
+    tt = one_bucket()
+    tt.store(KEY, 8, 10, EXACT, 1)
+    tt.new_search()
+    tt.store(KEY + 1, 2, 20, UPPER, 2)
+
+    assert tt.probe(KEY) is None
+    assert tt.probe(KEY + 1) == (2, 20, UPPER, 2)
+
+
+def test_move_is_kept_for_the_same_position():
+    tt = TranspositionTable(1)
+    tt.store(KEY, 3, 10, LOWER, 77)
+    tt.store(KEY, 4, 15, UPPER, 0)
+    assert tt.probe(KEY) == (4, 15, UPPER, 77)
+
+
+def test_mate_scores_are_stored_from_the_node():
+    score = MATE - 7
+    assert score_from_tt(score_to_tt(score, 4), 4) == score
+    assert score_from_tt(score_to_tt(score, 4), 2) == score + 2
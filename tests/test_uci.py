@@ -0,0 +1,21 @@
+import io
+
+from src.engine.uci import UciEngine
+from src.enums import PieceColor
+
+
+def test_position_with_moves():
+    engine = UciEngine(io.StringIO())
+    engine.set_position("startpos moves e2e4 e7e5 g1f3 b8c6 f1b5 a7a6 b5c6 d7c6 e1g1".split())
+
+    assert engine.game.chessboard.get_fen() == "r1bqkbnr/1pp2ppp/p1p5/4p3/4P3/5N2/PPPP1PPP/RNBQ1RK1 b kq - 1 5"
+    assert engine.game.has_move == PieceColor.BLACK
+
+
+def test_position_stops_at_an_illegal_move():
+    output = io.StringIO()
+    engine = UciEngine(output)
+    engine.set_position("startpos moves e2e4 e2e4".split())
+
+    assert "info string illegal move e2e4" in output.getvalue()
+    assert engine.game.chessboard.get_fen() == "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
@@ -0,0 +1,5 @@
+from src.engine.uci import main
+
+
+if __name__ == "__main__":
+    main()